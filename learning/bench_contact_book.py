@@ -0,0 +1,202 @@
+"""
+Contact Book Benchmark
+Times the main contact_book operations on made-up books of different sizes,
+so changes to the storage code can be compared between runs.
+
+Examples:
+    python bench_contact_book.py                       # 10k, 100k and 1M contacts, json backend
+    python bench_contact_book.py --sizes 1000 10000 --backends json sqlite mmap
+    python bench_contact_book.py --output results.json
+    python bench_contact_book.py --plain-records         # dict per contact, to compare memory
+
+For every operation we record how long it took (seconds) and, in a second run
+with tracemalloc switched on, the most memory Python allocated while it ran
+(peak_bytes). For load_contacts we also record how much memory the loaded
+book keeps using afterwards (retained_bytes, and bytes_per_contact).
+tracemalloc slows code down a lot, which is why time and memory are measured
+separately. Results are printed (or saved) as JSON.
+"""
+
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import contact_book
+
+FIRST_NAMES = ["Alice", "Bob", "Carol", "Dave", "Erin", "Frank", "Grace", "Heidi", "Ivan", "Judy"]
+LAST_NAMES = ["Smith", "Jones", "Brown", "Patel", "Garcia", "Kim", "Singh", "Lopez", "Chen", "Khan"]
+
+# Memory still in use at the end of the last timed(..., memory=True) call.
+last_retained = 0
+
+
+def make_book(size, seed=42):
+    """Build a dict of `size` made-up contacts. The same seed always gives the same book."""
+    rng = random.Random(seed)
+    book = {}
+    for i in range(size):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}"
+        book[name] = {"phone": f"{rng.randrange(10**9, 10**10)}", "email": f"user{i}@example.com"}
+    return book
+
+
+@contextlib.contextmanager
+def scripted_input(answers):
+    """
+    Answer input() prompts from a list instead of the keyboard, and throw away printed output.
+    This lets us run the interactive functions (search_contact, view_contacts, ...) unattended.
+    """
+    replies = iter(answers)
+    real_input = builtins.input
+    builtins.input = lambda prompt="": next(replies)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        builtins.input = real_input
+
+
+def timed(func, *args, answers=(), memory=False):
+    """
+    Run func(*args) once and return (result, seconds, peak_bytes or None).
+    With memory=True, the memory still in use when func returns is saved in last_retained.
+    """
+    global last_retained
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with scripted_input(answers):
+        result = func(*args)
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        last_retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def run_operations(names, searches, memory):
+    """
+    Run each operation once against the book in the current folder.
+    Returns {operation: (seconds, peak_bytes)}.
+    """
+    results = {}
+    contacts, seconds, peak = timed(contact_book.load_contacts, memory=memory)
+    results["load_contacts"] = (seconds, peak)
+    retained = last_retained
+
+    if contact_book.BACKEND == "json":
+        def save():
+            with contact_book.locked(contact_book.CONTACTS_FILE):
+                contact_book.compact_contacts(contacts)
+        _, seconds, peak = timed(save, memory=memory)
+        results["save_contacts"] = (seconds, peak)
+
+    # Exact name search, repeated and averaged because a single search is very fast.
+    queries = random.Random(1).sample(names, min(searches, len(names)))
+    answers = [a for name in queries for a in ("1", name.upper())]
+    _, seconds, peak = timed(lambda: [contact_book.search_contact(contacts) for _ in queries],
+                             answers=answers, memory=memory)
+    results["search_contact"] = (seconds / len(queries), peak)
+
+    # Typo search: drop one letter from each name.
+    answers = [a for name in queries for a in ("5", name[:2] + name[3:])]
+    _, seconds, peak = timed(lambda: [contact_book.search_contact(contacts) for _ in queries],
+                             answers=answers, memory=memory)
+    results["search_contact_fuzzy"] = (seconds / len(queries), peak)
+
+    # page_size=0: show every contact without stopping between pages.
+    _, seconds, peak = timed(contact_book.view_contacts, contacts, 0, memory=memory)
+    results["view_contacts"] = (seconds, peak)
+
+    # One add and one delete: with journaled storage these should not depend on book size.
+    _, seconds, peak = timed(contact_book.add_contact, contacts,
+                             answers=["Bench Person", "5550100", "bench@example.com"], memory=memory)
+    results["add_contact"] = (seconds, peak)
+    _, seconds, peak = timed(contact_book.delete_contact, contacts, answers=["Bench Person"], memory=memory)
+    results["delete_contact"] = (seconds, peak)
+
+    if hasattr(contacts, "close"):
+        contacts.close()
+    if memory:
+        results["retained"] = retained
+    return results
+
+
+def bench(size, backend, searches, memory):
+    """Benchmark one book size on one backend, in a fresh temporary folder."""
+    book = make_book(size)
+    names = list(book)
+    old_dir = os.getcwd()
+    old_backend = contact_book.BACKEND
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            with open(contact_book.CONTACTS_FILE, "w") as f:
+                json.dump(book, f)
+            del book
+            contact_book.BACKEND = backend
+            if backend != "json":
+                with scripted_input([]):
+                    contact_book.migrate_contacts("json", backend)
+            timings = run_operations(names, searches, memory=False)
+            peaks = run_operations(names, searches, memory=True) if memory else {}
+        finally:
+            contact_book.BACKEND = old_backend
+            os.chdir(old_dir)
+    retained = peaks.pop("retained", None)
+    operations = {}
+    for op, (seconds, _) in timings.items():
+        operations[op] = {"seconds": round(seconds, 6)}
+        if op in peaks:
+            operations[op]["peak_bytes"] = peaks[op][1]
+    result = {"backend": backend, "size": size, "compact_records": contact_book.COMPACT_RECORDS,
+              "operations": operations}
+    if retained is not None:
+        operations["load_contacts"]["retained_bytes"] = retained
+        result["bytes_per_contact"] = round(retained / size)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark contact_book at different sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--backends", nargs="+", default=["json"], choices=contact_book.BACKENDS)
+    parser.add_argument("--searches", type=int, default=200, help="searches to average over")
+    parser.add_argument("--no-memory", action="store_true", help="skip the (slow) tracemalloc run")
+    parser.add_argument("--output", help="write the JSON results to this file instead of printing them")
+    parser.add_argument("--plain-records", action="store_true",
+                        help="store each contact as a dict instead of a compact Contact record")
+    args = parser.parse_args()
+    contact_book.COMPACT_RECORDS = not args.plain_records
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": [],
+    }
+    for backend in args.backends:
+        for size in args.sizes:
+            print(f"Benchmarking {backend} with {size} contacts...", file=sys.stderr)
+            report["results"].append(bench(size, backend, args.searches, memory=not args.no_memory))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Results saved to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Weather App Load Test
+Sends weather lookups through weather_app.py at a steady rate and reports how
+many were answered per second and how long they took, so caching and
+concurrency changes can be compared without using the real wttr.in.
+
+Examples:
+    python bench_weather.py --standin --latency 0.05                 # start a pretend wttr.in in this process
+    python bench_weather.py --standin --error-rate 0.05 --rate 500 --duration 20
+    python bench_weather.py --standin --cache --cities 50            # go through the cache as well
+    python weather_standin.py --latency 0.1 &                        # or run the stand-in separately
+    python bench_weather.py --url http://127.0.0.1:8123 --output results.json
+
+Requests are started on a fixed schedule (rate per second), whether or not
+earlier ones have finished, like real users would. Each request's time is
+measured from when it was due to start, so waiting for a free worker counts too.
+p50 is the time half of the requests beat, p99 the time 99 in 100 beat.
+Results are printed (or saved) as JSON.
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+
+import weather_app
+from weather_cache import WeatherCache
+from weather_history import ObservationStore
+from weather_standin import start_server
+
+
+def percentile(sorted_values, p):
+    """The value p percent of sorted_values are at or below (0 for an empty list)."""
+    if not sorted_values:
+        return 0.0
+    index = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def timed_call(call, city, due):
+    """Run call(city); return (seconds since it was due, error name or None)."""
+    try:
+        call(city)
+        error = None
+    except Exception as e:
+        error = type(e).__name__
+    return time.perf_counter() - due, error
+
+
+def run_load(call, cities, rate, duration, workers, seed=1):
+    """Start rate * duration calls, one every 1/rate seconds, and summarize how they went."""
+    rng = random.Random(seed)
+    total = int(rate * duration)
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        start = time.perf_counter()
+        for i in range(total):
+            due = start + i / rate
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            futures.append(pool.submit(timed_call, call, rng.choice(cities), due))
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+    latencies = sorted(seconds for seconds, error in results if error is None)
+    errors = Counter(error for _, error in results if error is not None)
+    return {
+        "requests": total,
+        "ok": len(latencies),
+        "errors": dict(errors),
+        "seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test weather_app against a local wttr.in stand-in.")
+    parser.add_argument("--url", help="base URL of a running stand-in (e.g. http://127.0.0.1:8123)")
+    parser.add_argument("--standin", action="store_true", help="start a stand-in inside this process")
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in answer delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="stand-in delay varies by up to this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of stand-in answers that are 503s")
+    parser.add_argument("--days", type=int, default=3, help="forecast days in the stand-in payload")
+    parser.add_argument("--rate", type=float, default=100, help="requests started per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to keep sending")
+    parser.add_argument("--cities", type=int, default=100, help="how many different cities to ask for")
+    parser.add_argument("--workers", type=int, default=64, help="requests that may be in progress at once")
+    parser.add_argument("--cache", action="store_true", help="go through the cache (weather_app.lookup)")
+    parser.add_argument("--output", help="write the JSON results to this file instead of printing them")
+    args = parser.parse_args()
+    if not args.url and not args.standin:
+        parser.error("give --url of a running stand-in, or --standin to start one")
+
+    server = None
+    if args.standin:
+        server, args.url = start_server(0, args.latency, args.jitter, args.error_rate, args.days)
+    weather_app.BASE_URL = args.url
+    # A fresh in-memory cache and a throwaway history (don't touch the real files),
+    # and a connection pool as big as the load.
+    weather_app.cache = WeatherCache()
+    history_folder = tempfile.TemporaryDirectory()
+    weather_app.history = ObservationStore(history_folder.name)
+    weather_app.session.mount("http://", HTTPAdapter(pool_maxsize=args.workers))
+    call = (lambda city: weather_app.lookup(city, save=False)) if args.cache else weather_app.fetch_weather
+    cities = [f"City{i}" for i in range(args.cities)]
+
+    print(f"Sending {args.rate:g} requests/s for {args.duration:g}s to {args.url}...", file=sys.stderr)
+    try:
+        result = run_load(call, cities, args.rate, args.duration, args.workers)
+    finally:
+        if server is not None:
+            server.shutdown()
+        history_folder.cleanup()
+    if args.cache:
+        result["cache"] = weather_app.cache.stats()
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {key: value for key, value in vars(args).items() if key != "output"},
+        "result": result,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Results saved to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
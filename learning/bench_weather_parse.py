@@ -0,0 +1,96 @@
+"""
+Weather Parsing Benchmark
+Compares the two ways weather_parse.py can read a wttr.in format=j1 answer:
+- full: json.loads() the whole answer, then pick out current_condition
+        (what get_weather() used to do with response.json()),
+- lean: parse_lean(), fed the answer in CHUNK_SIZE pieces like a streamed download.
+
+Examples:
+    python bench_weather_parse.py                          # built-in sample, 3 forecast days
+    python bench_weather_parse.py --days 3 7 14            # bigger and bigger answers
+    python bench_weather_parse.py --payload london.json    # a real saved answer
+
+For each we record the average time per answer and, in a separate run with
+tracemalloc switched on, the most memory Python allocated while parsing one
+answer (peak_bytes). Results are printed (or saved) as JSON.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from weather_app import CHUNK_SIZE
+from weather_parse import parse_full, parse_lean
+from weather_standin import sample_payload
+
+
+def chunked(body, size=CHUNK_SIZE):
+    """body split into pieces of `size` bytes, like response.iter_content(size) gives them."""
+    return (body[i:i + size] for i in range(0, len(body), size))
+
+
+def parsers():
+    return {
+        "full": parse_full,
+        "lean": lambda body: parse_lean(chunked(body)),
+    }
+
+
+def bench(body, repeat):
+    """Time and measure both parsers on one answer (bytes)."""
+    results = {}
+    expected = dict(parse_full(body))
+    for name, parse in parsers().items():
+        if dict(parse(body)) != expected:
+            raise AssertionError(f"{name} parser gave a different answer")
+        start = time.perf_counter()
+        for _ in range(repeat):
+            parse(body)
+        seconds = (time.perf_counter() - start) / repeat
+        tracemalloc.start()
+        parse(body)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {"seconds": round(seconds, 9), "peak_bytes": peak}
+    results["speedup"] = round(results["full"]["seconds"] / results["lean"]["seconds"], 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full and lean parsing of wttr.in answers.")
+    parser.add_argument("--days", type=int, nargs="+", default=[3], help="forecast days in the built-in sample")
+    parser.add_argument("--payload", help="use this saved format=j1 file instead of the built-in sample")
+    parser.add_argument("--repeat", type=int, default=2000, help="answers to average over")
+    parser.add_argument("--output", help="write the JSON results to this file instead of printing them")
+    args = parser.parse_args()
+
+    if args.payload:
+        with open(args.payload, "rb") as f:
+            bodies = {args.payload: f.read()}
+    else:
+        bodies = {f"sample, {days} days": json.dumps(sample_payload(days)).encode("utf-8") for days in args.days}
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": [],
+    }
+    for label, body in bodies.items():
+        print(f"Benchmarking {label} ({len(body)} bytes)...", file=sys.stderr)
+        report["results"].append({"payload": label, "bytes": len(body), **bench(body, args.repeat)})
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Results saved to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,37 +4,313 @@
 
 import json
 import os
+import sys
+
+from contact_dedupe import conflicts, find_duplicates, merge_group
+from contact_index import IndexedContacts
+from contact_mmap import MappedContacts
+from contact_record import contact_from_json, contact_to_json
+from contact_sqlite import SqliteContacts
+from contact_transfer import export_contacts, import_rows, read_rows
+from file_lock import locked, write_atomically
+from paged_output import PAGE_SIZE, show_pages
 
 # File where we save and load contacts.
 # We use JSON format: the dictionary is converted to text (e.g. {"Alice": {"phone": "111", "email": "a@b.com"}})
 # so it can be written to a file, and we convert it back to a dict when we load.
 CONTACTS_FILE = "contacts.txt"
 
+# Rewriting the whole contacts file on every change gets slow for big books.
+# Instead, each add/delete is appended to this "journal" file as one line of JSON,
+# e.g. {"op": "add", "name": "Alice", "phone": "111", "email": "a@b.com"}.
+# ("update" records look like "add" ones, but change a contact that already exists.)
+# CONTACTS_FILE is then only a snapshot: the real book is snapshot + journal.
+JOURNAL_FILE = "contacts.journal"
+
+# The journal is folded back into the snapshot ("compacted") once it holds at least
+# this many records AND at least as many records as there are contacts.
+# Tying it to the book size keeps the average cost of one edit constant.
+COMPACT_AFTER = 1000
+
+# What we know about the journal (kept up to date by load_contacts and refresh_contacts):
+# - journal_records:    how many add/delete records it holds.
+# - journal_generation: the number in its header line, e.g. {"generation": 3}.
+#   Every compaction starts a new journal with the next number, so a different
+#   number means another program rewrote the snapshot.
+# - journal_position:   how many bytes of it we have already applied.
+# - journal_inode:      which file on disk it was (os.stat().st_ino).
+# Together, (generation, position) is the "version" of the book we have in memory.
+journal_records = 0
+journal_generation = 0
+journal_position = 0
+journal_inode = None
+
+# Where the contacts live:
+# - "json":   CONTACTS_FILE + JOURNAL_FILE, loaded fully into memory (the default).
+# - "sqlite": a SQLite database in SQLITE_FILE, read lazily one query at a time,
+#             so startup time and memory don't grow with the size of the book.
+# - "mmap":   one JSON record per line in MMAP_FILE, memory-mapped and decoded
+#             only when a contact is looked at (see contact_mmap.py).
+# Pick one by setting the CONTACT_BOOK_BACKEND environment variable.
+BACKENDS = ("json", "sqlite", "mmap")
+BACKEND = os.environ.get("CONTACT_BOOK_BACKEND", "json")
+SQLITE_FILE = "contacts.db"
+MMAP_FILE = "contacts.jsonl"
 
-def load_contacts():
+# Keep each contact's details in a small Contact record instead of a dict while the
+# program runs (json backend only). It acts just like the dict and is saved the same
+# way, but uses a fraction of the memory - see contact_record.py.
+COMPACT_RECORDS = True
+
+
+def load_contacts(backend=None):
     """
     Load contacts from the file when the program starts.
-    - If the file doesn't exist yet (first run), we return an empty dictionary.
+    - If the file doesn't exist yet (first run), we start from an empty dictionary.
     - We read the file as text, then use json.load() to turn that text back into a Python dict.
+    - Then we replay the journal on top, so edits made since the last snapshot come back too.
+    - Finally we wrap the dict in IndexedContacts so searches don't have to scan every contact.
+    With the "sqlite" and "mmap" backends we just open the file instead; nothing is read up front.
+    A damaged contacts file raises an error instead of quietly giving an empty book
+    (which would then be saved over the damaged file).
     """
-    if not os.path.exists(CONTACTS_FILE):
-        return {}
+    backend = backend or BACKEND
+    if backend == "sqlite":
+        return SqliteContacts(SQLITE_FILE)
+    if backend == "mmap":
+        return MappedContacts(MMAP_FILE, compact_after=COMPACT_AFTER)
+    return IndexedContacts(read_book(), compact=COMPACT_RECORDS)
+
+
+def read_book():
+    """Read the snapshot plus the whole journal into a plain dict."""
+    global journal_records, journal_generation, journal_position, journal_inode
+    journal_records = 0
+    journal_generation = 0
+    journal_position = 0
+    journal_inode = None
+    # Open the journal *before* reading the snapshot. A program that is compacting
+    # replaces the snapshot first and the journal second, so with this order we can
+    # never combine a brand-new journal with an out-of-date snapshot.
+    try:
+        journal = open(JOURNAL_FILE, "rb")
+    except FileNotFoundError:
+        journal = None
     try:
-        with open(CONTACTS_FILE, "r") as f:
-            contacts = json.load(f)
-        return contacts
-    except (json.JSONDecodeError, IOError):
-        return {}
+        contacts = {}
+        if os.path.exists(CONTACTS_FILE):
+            with open(CONTACTS_FILE, "r") as f:
+                contacts = json.load(f, object_hook=contact_from_json if COMPACT_RECORDS else None)
+        if journal is not None:
+            journal_inode = os.fstat(journal.fileno()).st_ino
+            journal_position, _ = replay_journal(contacts, journal, 0)
+    finally:
+        if journal is not None:
+            journal.close()
+    return contacts
 
 
 def save_contacts(contacts):
     """
     Save the contacts dictionary to the file.
     - json.dumps() converts our dict into a string (e.g. '{"Alice": {"phone": "111", "email": "a@b.com"}}').
-    - We write that string to the file so we can read it back later with json.load().
+    - We write that string to a temporary file and then swap it in, so other programs
+      (and a crash halfway through) never see a half-written contacts file.
+    """
+    write_atomically(CONTACTS_FILE, lambda f: json.dump(contacts, f, indent=2, default=contact_to_json))
+
+
+def apply_change(contacts, record):
+    """Apply one journal record (an "add", "update" or "delete") to the contacts dict."""
+    if record["op"] in ("add", "update"):
+        contacts[record["name"]] = {"phone": record["phone"], "email": record["email"]}
+    elif record["op"] == "delete":
+        contacts.pop(record["name"], None)
+
+
+def replay_journal(contacts, f, start):
+    """
+    Apply the journal records in the open file f, starting at byte `start`.
+    Returns (position just after the last complete record, set of names the records changed).
+    - The first line is a header like {"generation": 3}, not a change.
+    - A line without "\n" at the end is still being written by another program
+      (or was cut off by a crash), so we stop just before it.
+    """
+    global journal_records, journal_generation
+    f.seek(start)
+    position = start
+    touched = set()
+    for line in f:
+        if not line.endswith(b"\n"):
+            break
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            break
+        position += len(line)
+        if "generation" in record:
+            journal_generation = record["generation"]
+            continue
+        apply_change(contacts, record)
+        touched.add(record["name"])
+        journal_records += 1
+    return position, touched
+
+
+def read_generation(f):
+    """Return the generation number from the journal's header line (0 for old journals without one)."""
+    f.seek(0)
+    try:
+        header = json.loads(f.readline())
+    except json.JSONDecodeError:
+        return 0
+    return header.get("generation", 0) if isinstance(header, dict) else 0
+
+
+def journal_signature():
+    """(inode, size) of the journal file, or None if there isn't one yet."""
+    try:
+        info = os.stat(JOURNAL_FILE)
+    except FileNotFoundError:
+        return None
+    return info.st_ino, info.st_size
+
+
+def refresh_contacts(contacts):
+    """
+    Catch up with changes that other programs made to the files since we last looked.
+    - Usually nothing changed, and a single os.stat() call tells us so.
+    - If the journal only grew, we replay just the new records at its end.
+    - If another program compacted (new generation), we reload everything.
+    Never takes the lock, so readers never hold up writers.
+    Returns (reloaded, touched): whether we reloaded everything, and which names
+    the replayed records changed.
     """
-    with open(CONTACTS_FILE, "w") as f:
-        json.dump(contacts, f, indent=2)
+    global journal_position
+    if not isinstance(contacts, IndexedContacts):
+        # The SQLite and mmap books read straight from their files already.
+        return False, set()
+    signature = journal_signature()
+    if signature == (journal_inode, journal_position) or (signature is None and journal_inode is None):
+        return False, set()
+    if signature is not None and signature[0] == journal_inode and signature[1] >= journal_position:
+        with open(JOURNAL_FILE, "rb") as f:
+            if read_generation(f) == journal_generation:
+                journal_position, touched = replay_journal(contacts, f, journal_position)
+                return False, touched
+    contacts.reset(read_book())
+    return True, set()
+
+
+def start_new_journal(generation):
+    """Replace the journal with an empty one whose header holds the given generation."""
+    global journal_generation, journal_position, journal_inode, journal_records
+    header = json.dumps({"generation": generation}) + "\n"
+    write_atomically(JOURNAL_FILE, lambda f: f.write(header))
+    journal_generation = generation
+    journal_position = len(header)
+    journal_inode = os.stat(JOURNAL_FILE).st_ino
+    journal_records = 0
+
+
+def still_valid(contacts, record, reloaded, touched):
+    """
+    After catching up with other programs, check that our change still makes sense.
+    - If nobody else touched the name, it does.
+    - Otherwise an add only goes ahead if the name is (still) free,
+      and an update or delete only if the contact is still there.
+    """
+    if not reloaded and record["name"] not in touched:
+        return True
+    present = record["name"] in contacts
+    return not present if record["op"] == "add" else present
+
+
+def log_change(contacts, op, name):
+    """
+    Record one add/delete by appending a single line to the journal.
+    - This costs the same no matter how many contacts there are.
+    - Once the journal is big enough we compact it (see COMPACT_AFTER).
+    Returns False if another program changed the same contact first and ours was dropped.
+    """
+    return not log_changes(contacts, [(op, name)])
+
+
+def log_changes(contacts, changes):
+    """
+    Record a batch of (op, name) changes with one write to the journal.
+    Bulk imports use this so a million new contacts don't mean a million file opens.
+    Each change is kept or dropped on its own; returns the names whose changes were dropped.
+    """
+    return log_change_groups(contacts, [[change] for change in changes])
+
+
+def log_change_groups(contacts, groups):
+    """
+    Record groups of (op, name) changes with one write to the journal.
+    Several programs may share the same files, so while holding the lock we:
+    1. catch up with anything they wrote since we last looked (refresh_contacts),
+    2. drop our changes that clash with theirs (still_valid) - "optimistic" locking:
+       we only find out about a clash at save time, and nobody waits while editing.
+       A group is all-or-nothing: if one of its changes clashes, none are saved
+       (so a merge never deletes duplicates without updating the contact kept),
+    3. append the rest, and compact if the journal has grown big.
+    Returns the names whose changes were dropped.
+    """
+    global journal_position, journal_records
+    if hasattr(contacts, "commit"):
+        # SQLite and mmap books write changes as they happen; commit() makes them stick.
+        contacts.commit()
+        return []
+    pending = []
+    for group in groups:
+        records = []
+        for op, name in group:
+            record = {"op": op, "name": name}
+            if op != "delete":
+                record["phone"] = contacts[name]["phone"]
+                record["email"] = contacts[name]["email"]
+            records.append(record)
+        pending.append(records)
+    saved = []
+    dropped = []
+    with locked(CONTACTS_FILE):
+        reloaded, touched = refresh_contacts(contacts)
+        for records in pending:
+            if all(still_valid(contacts, record, reloaded, touched) for record in records):
+                for record in records:
+                    # Put our change back on top of whatever we just re-read.
+                    apply_change(contacts, record)
+                saved.extend(records)
+            else:
+                dropped.extend(record["name"] for record in records)
+        if journal_signature() is None:
+            start_new_journal(journal_generation + 1)
+        elif os.path.getsize(JOURNAL_FILE) > journal_position:
+            # Nobody else is writing (we hold the lock), so anything past what we
+            # could read is a line cut off by a crash: trim it before appending.
+            os.truncate(JOURNAL_FILE, journal_position)
+        if saved:
+            with open(JOURNAL_FILE, "a") as f:
+                f.write("".join(json.dumps(record) + "\n" for record in saved))
+            journal_position = os.path.getsize(JOURNAL_FILE)
+            journal_records += len(saved)
+        if dropped and not reloaded and any(len(records) > 1 for records in pending):
+            # Parts of a dropped group that nobody else touched are still changed in
+            # memory only; re-read the book so memory matches what is saved.
+            contacts.reset(read_book())
+        elif journal_records >= max(COMPACT_AFTER, len(contacts)):
+            compact_contacts(contacts)
+    return dropped
+
+
+def compact_contacts(contacts):
+    """
+    Write a fresh snapshot of all contacts and start an empty journal with the next generation.
+    Call this while holding locked(CONTACTS_FILE).
+    """
+    save_contacts(contacts)
+    start_new_journal(journal_generation + 1)
 
 
 def add_contact(contacts):
@@ -50,38 +326,71 @@ def add_contact(contacts):
         phone = input("Enter phone: ").strip()
         email = input("Enter email: ").strip()
         contacts[name] = {"phone": phone, "email": email}
-        save_contacts(contacts)
-        print("Contact added successfully.")
+        if log_change(contacts, "add", name):
+            print("Contact added successfully.")
+        else:
+            print("Another program added a contact with that name first; yours was not saved.")
     except Exception as e:
         print(f"Error adding contact: {e}")
 
 
-def view_contacts(contacts):
-    """Show all contacts. Each contact is stored as name -> {phone, email}."""
+def view_contacts(contacts, page_size=PAGE_SIZE):
+    """
+    Show all contacts, a page at a time (page_size=0 shows them all at once).
+    Each contact is stored as name -> {phone, email}.
+    """
     if not contacts:
         print("No contacts yet.")
         return
     print("\n--- All contacts ---")
-    for name, info in contacts.items():
-        print(f"  {name}: phone={info['phone']}, email={info['email']}")
+    show_pages(contacts.items, len(contacts),
+               lambda item: f"  {item[0]}: phone={item[1]['phone']}, email={item[1]['email']}", page_size)
     print()
 
 
+def print_matches(contacts, names):
+    """Print each matching contact, or a message if there were none."""
+    if not names:
+        print("No contact found.")
+        return
+    for name in names:
+        info = contacts[name]
+        print(f"Found: {name} - phone={info['phone']}, email={info['email']}")
+
+
 def search_contact(contacts):
-    """Search by name (case-insensitive)."""
-    search_name = input("Enter name to search: ").strip()
-    if not search_name:
-        print("Please enter a name.")
+    """
+    Search by name (case-insensitive), by the start of a name, by phone, by email,
+    or by a name that may contain typos.
+    Each search is a lookup in one of the indexes kept by IndexedContacts.
+    """
+    print("Search by: 1. Name  2. Name starts with  3. Phone  4. Email  5. Similar name (typos ok)")
+    mode = input("Choose search type (1-5, default 1): ").strip() or "1"
+    if mode not in ("1", "2", "3", "4", "5"):
+        print("Invalid search type.")
         return
-    search_lower = search_name.lower()
-    found = False
-    for name, info in contacts.items():
-        if name.lower() == search_lower:
-            print(f"Found: {name} - phone={info['phone']}, email={info['email']}")
-            found = True
-            break
-    if not found:
-        print("No contact found with that name.")
+    text = input("Enter search text: ").strip()
+    if not text:
+        print("Please enter something to search for.")
+        return
+    if mode == "1":
+        names = contacts.find(text)
+        if not names:
+            # No exact match: suggest names that start with what was typed,
+            # or failing that, names that look similar.
+            suggestions = contacts.starting_with(text, limit=5) or contacts.fuzzy_find(text)
+            if suggestions:
+                print("No exact match. Did you mean: " + ", ".join(suggestions))
+                return
+    elif mode == "2":
+        names = contacts.starting_with(text, limit=20)
+    elif mode == "3":
+        names = contacts.with_phone(text)
+    elif mode == "4":
+        names = contacts.with_email(text)
+    else:
+        names = contacts.fuzzy_find(text)
+    print_matches(contacts, names)
 
 
 def delete_contact(contacts):
@@ -92,25 +401,171 @@ def delete_contact(contacts):
         return
     if name in contacts:
         del contacts[name]
-        save_contacts(contacts)
-        print("Contact deleted.")
+        # A delete is only dropped when the contact is gone already (see still_valid).
+        if log_change(contacts, "delete", name):
+            print("Contact deleted.")
+        else:
+            print("Contact was already deleted by another program.")
     else:
         print("No contact found with that name.")
 
 
+def import_contacts(contacts, path=None):
+    """
+    Bulk-add contacts from a CSV (name,phone,email) or vCard (.vcf) file.
+    The file is read row by row and the journal is written once per batch, not once per contact.
+    """
+    if path is None:
+        path = input("Enter file to import (.csv or .vcf): ").strip()
+    if not path:
+        print("Please enter a file name.")
+        return
+    # Names another program added at the same time (see log_changes).
+    clashes = []
+    try:
+        counts = import_rows(contacts, read_rows(path), lambda changes: clashes.extend(log_changes(contacts, changes)))
+    except (IOError, UnicodeDecodeError) as e:
+        print(f"Error importing contacts: {e}")
+        return
+    print(f"Imported {counts['added'] - len(clashes)} contacts "
+          f"({counts['duplicate'] + len(clashes)} duplicates skipped, {counts['invalid']} invalid rows skipped).")
+
+
+def export_contacts_to_file(contacts, path=None):
+    """Write every contact to a CSV or vCard (.vcf) file, one contact at a time."""
+    if path is None:
+        path = input("Enter file to export to (.csv or .vcf): ").strip()
+    if not path:
+        print("Please enter a file name.")
+        return
+    try:
+        count = export_contacts(contacts, path)
+    except IOError as e:
+        print(f"Error exporting contacts: {e}")
+        return
+    print(f"Exported {count} contacts to {path}.")
+
+
+def merge_duplicates(contacts, apply=None):
+    """
+    Find contacts that are probably the same person (same phone, email or name once
+    cleaned up - see contact_dedupe.py), show them, and merge them if the user agrees.
+    Groups with different phone numbers or emails are only listed for the user to
+    check, because merging them would lose one of the values.
+    apply=True/False skips the question (used by the command-line version).
+    """
+    found = find_duplicates(contacts)
+    if not found:
+        print("No duplicates found.")
+        return
+    groups, review = [], []
+    for names in found:
+        (review if conflicts(contacts, names) else groups).append(names)
+    if review:
+        print(f"\n{len(review)} groups look alike but have different phone numbers or emails,")
+        print("so they won't be merged. Please check them yourself:")
+        for names in review[:20]:
+            details = ", ".join(f"{name} ({contacts[name]['phone']}, {contacts[name]['email']})" for name in names)
+            print("  " + details)
+        if len(review) > 20:
+            print(f"  ... and {len(review) - 20} more")
+    if not groups:
+        print("No duplicates can be merged safely.")
+        return
+    print(f"\nFound {len(groups)} groups of duplicates that can be merged:")
+    for names in groups[:20]:
+        print("  " + " | ".join(names))
+    if len(groups) > 20:
+        print(f"  ... and {len(groups) - 20} more")
+    if apply is None:
+        apply = input("Merge all of these? (y/n): ").strip().lower() == "y"
+    if not apply:
+        print("Nothing changed.")
+        return
+    merges = [merge_group(contacts, names) for names in groups]
+    # Save every merge with one journal write; each group is saved whole or not at all.
+    clashes = set(log_change_groups(contacts, merges))
+    saved = [changes for changes in merges if not any(name in clashes for _, name in changes)]
+    removed = sum(1 for changes in saved for op, _ in changes if op == "delete")
+    print(f"Merged {len(saved)} groups ({removed} contacts removed).")
+    if len(saved) < len(merges):
+        print(f"{len(merges) - len(saved)} groups were left as they were because another program "
+              "changed those contacts first.")
+
+
+def migrate_contacts(source, target):
+    """
+    Copy the whole book from one backend to the other, e.g. "json" -> "sqlite".
+    The target book is replaced; the source is left untouched.
+    """
+    if source not in BACKENDS or target not in BACKENDS or source == target:
+        print(f"Please choose two different backends from: {', '.join(BACKENDS)}.")
+        return
+    contacts = load_contacts(source)
+    if target == "json":
+        with locked(CONTACTS_FILE):
+            compact_contacts(dict(contacts.items()))
+        count = len(contacts)
+    else:
+        book = load_contacts(target)
+        book.clear()
+        for name, info in contacts.items():
+            book[name] = info
+        # One commit for the whole copy: much faster than committing each contact.
+        book.commit()
+        count = len(book)
+        book.close()
+    print(f"Copied {count} contacts from {source} to {target}.")
+
+
 def main():
-    # Load contacts from file when program starts (empty dict if file doesn't exist).
-    contacts = load_contacts()
+    if BACKEND not in BACKENDS:
+        print(f"Unknown CONTACT_BOOK_BACKEND '{BACKEND}'. Use one of: {', '.join(BACKENDS)}.")
+        return
+
+    try:
+        # Switching backends doesn't need the book loaded first:
+        #   python contact_book.py migrate json sqlite
+        if len(sys.argv) == 4 and sys.argv[1] == "migrate":
+            migrate_contacts(sys.argv[2], sys.argv[3])
+            return
+        # Load contacts from file when program starts (empty dict if file doesn't exist).
+        contacts = load_contacts()
+    except (json.JSONDecodeError, IOError) as e:
+        # Stop rather than start with an empty book and save it over the damaged file.
+        print(f"Error: could not read the contacts file ({e}).")
+        print("Please fix or restore it, then run the program again.")
+        return
+
+    # Bulk commands can also be run without the menu, e.g.:
+    #   python contact_book.py import people.csv
+    #   python contact_book.py export backup.vcf
+    #   python contact_book.py dedupe          (list duplicates)
+    #   python contact_book.py dedupe --apply  (and merge them)
+    if len(sys.argv) >= 2 and sys.argv[1] == "dedupe":
+        merge_duplicates(contacts, apply="--apply" in sys.argv)
+        return
+    if len(sys.argv) == 3 and sys.argv[1] in ("import", "export"):
+        if sys.argv[1] == "import":
+            import_contacts(contacts, sys.argv[2])
+        else:
+            export_contacts_to_file(contacts, sys.argv[2])
+        return
 
     while True:
         print("\n--- Contact Book Menu ---")
         print("1. Add new contact")
         print("2. View all contacts")
-        print("3. Search for a contact by name")
+        print("3. Search for a contact")
         print("4. Delete a contact")
-        print("5. Exit")
+        print("5. Import contacts from a file")
+        print("6. Export contacts to a file")
+        print("7. Find and merge duplicates")
+        print("8. Exit")
 
-        choice = input("Choose an option (1-5): ").strip()
+        choice = input("Choose an option (1-8): ").strip()
+        # Pick up anything other programs changed while we were waiting for input.
+        refresh_contacts(contacts)
 
         if choice == "1":
             add_contact(contacts)
@@ -121,10 +576,16 @@ def main():
         elif choice == "4":
             delete_contact(contacts)
         elif choice == "5":
+            import_contacts(contacts)
+        elif choice == "6":
+            export_contacts_to_file(contacts)
+        elif choice == "7":
+            merge_duplicates(contacts)
+        elif choice == "8":
             print("Goodbye!")
             break
         else:
-            print("Invalid option. Please enter 1, 2, 3, 4, or 5.")
+            print("Invalid option. Please enter a number from 1 to 8.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,151 @@
+# Duplicate contacts
+# Finds contacts that are probably the same person, e.g.
+#     "John Smith"  phone="(555) 010-1234"  email="John.Smith@Gmail.com"
+#     "smith john"  phone="+1 555 010 1234" email="johnsmith@gmail.com"
+# and merges each group into one contact. Groups whose contacts have different
+# phone numbers or emails (e.g. two people sharing a family email) are only
+# listed, never merged, since merging would throw one of the values away.
+#
+# Comparing every contact with every other one would take n*n steps (a trillion
+# for a million contacts). Instead each contact gets a few "blocking keys"
+# (its cleaned-up phone, email and name) and contacts that share a key are put in
+# the same group - one pass over the book plus dictionary lookups.
+
+import re
+
+# Phone numbers shorter than this (after removing everything but digits) are too
+# short to tell people apart, so we don't use them to match.
+MIN_PHONE_DIGITS = 7
+# Only the last 10 digits are compared, so "+1 555 010 1234" matches "555-010-1234".
+PHONE_DIGITS_COMPARED = 10
+# These providers ignore dots in the part before the "@".
+DOTLESS_EMAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+
+NON_DIGITS = re.compile(r"\D")
+WORDS = re.compile(r"\w+")
+
+
+def normalize_phone(phone):
+    """Keep only the digits (the last 10 of them). Returns "" if too short to be useful."""
+    digits = NON_DIGITS.sub("", phone)
+    if len(digits) < MIN_PHONE_DIGITS:
+        return ""
+    return digits[-PHONE_DIGITS_COMPARED:]
+
+
+def normalize_email(email):
+    """
+    Lower-case the email and drop parts that don't change where mail goes:
+    "John.Smith+work@Gmail.com" -> "johnsmith@gmail.com".
+    """
+    email = email.strip().lower()
+    local, at, domain = email.partition("@")
+    if not at or not local or not domain:
+        return ""
+    local = local.split("+")[0]
+    if domain in DOTLESS_EMAIL_DOMAINS:
+        local = local.replace(".", "")
+    return f"{local}@{domain}"
+
+
+def name_key(name):
+    """"Smith, John" and "john  SMITH" both become "john smith"."""
+    words = WORDS.findall(name.casefold())
+    return " ".join(sorted(words))
+
+
+def blocking_keys(name, info):
+    """The keys a contact is grouped under. Two contacts sharing any key are possible duplicates."""
+    keys = [("name", name_key(name)),
+            ("phone", normalize_phone(info["phone"])),
+            ("email", normalize_email(info["email"]))]
+    return [key for key in keys if key[1]]
+
+
+def find_root(parent, name):
+    """Follow parent links up to the name that represents the whole group."""
+    while parent[name] != name:
+        # Point each name we pass at its grandparent, so later lookups are shorter.
+        parent[name] = parent[parent[name]]
+        name = parent[name]
+    return name
+
+
+def find_duplicates(contacts):
+    """
+    Return a list of duplicate groups, each a sorted list of 2+ names.
+    - first_with_key remembers the first contact seen for every blocking key.
+    - When a later contact has the same key, the two groups are joined
+      ("union-find"), so A~B by phone and B~C by email puts A, B and C together.
+    This is one pass over the contacts, then a sort of the groups.
+    """
+    parent = {}
+    first_with_key = {}
+    for name, info in contacts.items():
+        parent[name] = name
+        for key in blocking_keys(name, info):
+            other = first_with_key.setdefault(key, name)
+            if other != name:
+                root, other_root = find_root(parent, name), find_root(parent, other)
+                if root != other_root:
+                    parent[root] = other_root
+    groups = {}
+    for name in parent:
+        groups.setdefault(find_root(parent, name), []).append(name)
+    return sorted(sorted(names) for names in groups.values() if len(names) > 1)
+
+
+def comparable(field, value):
+    """The form two phones or emails are compared in: normalized, or just tidied if too short for that."""
+    if field == "phone":
+        return normalize_phone(value) or value.strip()
+    return normalize_email(value) or value.strip().lower()
+
+
+def conflicts(contacts, names):
+    """
+    The fields ("phone", "email") for which the group holds more than one
+    different non-empty value. Such a group can't be merged without losing data.
+    """
+    found = []
+    for field in ("phone", "email"):
+        values = {comparable(field, contacts[name][field]) for name in names}
+        values.discard("")
+        if len(values) > 1:
+            found.append(field)
+    return found
+
+
+def pick_keeper(contacts, names):
+    """Keep the contact with the most details filled in (ties go to the longest name)."""
+    def score(name):
+        info = contacts[name]
+        return (bool(info["phone"]) + bool(info["email"]), len(name), name)
+    return max(names, key=score)
+
+
+def merge_group(contacts, names):
+    """
+    Merge one group into a single contact and return the (op, name) changes made.
+    - The keeper's own phone/email win; empty ones are filled in from the others.
+    - The other contacts in the group are deleted.
+    - A group with conflicts() is left alone (no changes), so no phone number
+      or email is ever lost.
+    """
+    if conflicts(contacts, names):
+        return []
+    keeper = pick_keeper(contacts, names)
+    merged = dict(contacts[keeper])
+    changes = []
+    for name in names:
+        if name == keeper:
+            continue
+        for field in ("phone", "email"):
+            if not merged[field] and contacts[name][field]:
+                merged[field] = contacts[name][field]
+        del contacts[name]
+        changes.append(("delete", name))
+    if merged != dict(contacts[keeper]):
+        contacts[keeper] = merged
+        changes.append(("update", keeper))
+    return changes
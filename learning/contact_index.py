@@ -0,0 +1,260 @@
+# Contact Index
+# Lookup tables that let the contact book answer searches without looping
+# over every contact. The IndexedContacts class below is still a normal dict
+# ({name: {"phone": ..., "email": ...}}), it just updates its indexes every
+# time a contact is added, replaced or deleted.
+
+import heapq
+from bisect import bisect_left, insort
+from collections import Counter
+from difflib import get_close_matches
+
+from contact_record import Contact
+
+# fuzzy_find ranks at most this many shortlisted names with difflib.
+FUZZY_SHORTLIST = 200
+
+
+def fold(text):
+    """Turn text into the form we compare on: "  ALICE " -> "alice"."""
+    return text.strip().casefold()
+
+
+def trigrams(text):
+    """
+    Split text into overlapping 3-letter pieces ("trigrams"), used for typo-tolerant search.
+    - "bob" is padded to "  bob " first, giving {"  b", " bo", "bob", "ob "}.
+    - Two spellings of the same name share most of their trigrams even with a typo.
+    """
+    padded = "  " + fold(text) + " "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def add_to_group(groups, key, name):
+    """
+    Add name to the group stored under key.
+    - Most keys belong to just one name, so a single name is stored as a plain string.
+    - Only when a second name arrives does it become a set (an empty set alone costs
+      about 200 bytes, which adds up over a million contacts).
+    """
+    if not key:
+        return
+    current = groups.get(key)
+    if current is None:
+        groups[key] = name
+    elif isinstance(current, set):
+        current.add(name)
+    elif current != name:
+        groups[key] = {current, name}
+
+
+def remove_from_group(groups, key, name):
+    """Remove name from the group under key, and drop the key once it is empty."""
+    current = groups.get(key)
+    if current is None:
+        return
+    if isinstance(current, set):
+        current.discard(name)
+        if len(current) == 1:
+            groups[key] = current.pop()
+    elif current == name:
+        del groups[key]
+
+
+def members(groups, key):
+    """All names in the group under key (a set, or a 1-tuple for a single name)."""
+    current = groups.get(key)
+    if current is None:
+        return ()
+    if isinstance(current, set):
+        return current
+    return (current,)
+
+
+class NameIndex:
+    """
+    Name lookups shared by the in-memory and file-backed contact books.
+    - by_name:  folded name  -> real names ("alice" -> {"Alice", "ALICE"}, or just "Alice")
+    - sorted_names: sorted list of (folded name, name) pairs, searched with bisect
+      for "starts with" queries.
+    - by_gram:  trigram      -> folded names containing it, for fuzzy search.
+    (See add_to_group for how these groups are stored.)
+    Only names are needed to build it, so a book can offer these searches
+    without reading any phone numbers or emails.
+    """
+
+    def _init_names(self):
+        self.by_name = {}
+        self.sorted_names = []
+        self.by_gram = {}
+
+    def _add_name(self, name, keep_sorted=True):
+        folded = fold(name)
+        if folded not in self.by_name:
+            for gram in trigrams(folded):
+                add_to_group(self.by_gram, gram, folded)
+        add_to_group(self.by_name, folded, name)
+        if keep_sorted:
+            insort(self.sorted_names, (folded, name))
+        else:
+            self.sorted_names.append((folded, name))
+
+    def _remove_name(self, name):
+        folded = fold(name)
+        remove_from_group(self.by_name, folded, name)
+        if folded not in self.by_name:
+            for gram in trigrams(folded):
+                remove_from_group(self.by_gram, gram, folded)
+        entry = (folded, name)
+        i = bisect_left(self.sorted_names, entry)
+        if i < len(self.sorted_names) and self.sorted_names[i] == entry:
+            del self.sorted_names[i]
+
+    def _clear_names(self):
+        self.by_name.clear()
+        self.sorted_names.clear()
+        self.by_gram.clear()
+
+    def find(self, name):
+        """Names that match name exactly, ignoring upper/lower case."""
+        return sorted(members(self.by_name, fold(name)))
+
+    def starting_with(self, prefix, limit=None):
+        """
+        Names that start with prefix (ignoring case), in alphabetical order.
+        - bisect jumps straight to the first candidate, then we walk forward
+          only while names still match, so we never look at the whole list.
+        """
+        prefix = fold(prefix)
+        results = []
+        i = bisect_left(self.sorted_names, (prefix, ""))
+        while i < len(self.sorted_names) and self.sorted_names[i][0].startswith(prefix):
+            results.append(self.sorted_names[i][1])
+            if limit is not None and len(results) >= limit:
+                break
+            i += 1
+        return results
+
+    def fuzzy_find(self, name, limit=5, cutoff=0.6):
+        """
+        Names that look like name even with typos, best match first.
+        - First we shortlist, through the by_gram index: a name must share at least a
+          third of the trigrams of the query or of itself, whichever has more (so a
+          long name doesn't get in just by containing a short query). Only the
+          FUZZY_SHORTLIST names sharing the biggest part are kept.
+        - Then difflib ranks just that shortlist by similarity and keeps the top `limit`.
+        So the slow difflib step costs the same however big the book is.
+        """
+        grams = trigrams(name)
+        shared = Counter()
+        for gram in grams:
+            shared.update(members(self.by_gram, gram))
+        needed = max(1, len(grams) // 3)
+        scores = {}
+        for folded, count in shared.items():
+            if count < needed:
+                continue
+            most = max(len(grams), len(trigrams(folded)))
+            if count >= most // 3:
+                scores[folded] = count / most
+        shortlist = heapq.nlargest(FUZZY_SHORTLIST, scores, key=scores.get)
+        best = get_close_matches(fold(name), shortlist, n=limit, cutoff=cutoff)
+        return [real for folded in best for real in sorted(members(self.by_name, folded))]
+
+
+class IndexedContacts(NameIndex, dict):
+    """
+    A contacts dict that keeps search indexes in sync with its contents.
+    - The name indexes come from NameIndex (exact, "starts with" and fuzzy search).
+    - by_phone: phone        -> names
+    - by_email: folded email -> names
+    With compact=True each contact's details are stored as a Contact record
+    (see contact_record.py) instead of a dict, which uses much less memory.
+    Always replace a contact's whole info dict (contacts[name] = {...});
+    changing contacts[name]["phone"] in place would not update the indexes.
+    """
+
+    def __init__(self, data=None, compact=False):
+        super().__init__()
+        self.compact = compact
+        self._init_names()
+        self.by_phone = {}
+        self.by_email = {}
+        if data:
+            self.reset(data)
+
+    def reset(self, data):
+        """Replace all contacts with the ones in data (a plain dict)."""
+        self.clear()
+        # Fill everything first and sort once at the end: much faster than
+        # inserting into the sorted list one contact at a time.
+        for name, info in data.items():
+            if self.compact:
+                info = Contact.from_info(info)
+            dict.__setitem__(self, name, info)
+            self._index(name, info, keep_sorted=False)
+        self.sorted_names.sort()
+
+    # --- keeping the indexes up to date ---
+
+    def _index(self, name, info, keep_sorted=True):
+        self._add_name(name, keep_sorted)
+        add_to_group(self.by_phone, info["phone"].strip(), name)
+        add_to_group(self.by_email, fold(info["email"]), name)
+
+    def _unindex(self, name, info):
+        self._remove_name(name)
+        remove_from_group(self.by_phone, info["phone"].strip(), name)
+        remove_from_group(self.by_email, fold(info["email"]), name)
+
+    def __setitem__(self, name, info):
+        if name in self:
+            self._unindex(name, self[name])
+        if self.compact:
+            info = Contact.from_info(info)
+        dict.__setitem__(self, name, info)
+        self._index(name, info)
+
+    def __delitem__(self, name):
+        info = self[name]
+        dict.__delitem__(self, name)
+        self._unindex(name, info)
+
+    def pop(self, name, *default):
+        if name in self:
+            info = self[name]
+            del self[name]
+            return info
+        if default:
+            return default[0]
+        raise KeyError(name)
+
+    def popitem(self):
+        name, info = dict.popitem(self)
+        self._unindex(name, info)
+        return name, info
+
+    def setdefault(self, name, info=None):
+        if name not in self:
+            self[name] = info
+        return self[name]
+
+    def update(self, *args, **kwargs):
+        for name, info in dict(*args, **kwargs).items():
+            self[name] = info
+
+    def clear(self):
+        dict.clear(self)
+        self._clear_names()
+        self.by_phone.clear()
+        self.by_email.clear()
+
+    # --- searching ---
+
+    def with_phone(self, phone):
+        """Names of contacts that have this phone number."""
+        return sorted(members(self.by_phone, phone.strip()))
+
+    def with_email(self, email):
+        """Names of contacts that have this email (ignoring case)."""
+        return sorted(members(self.by_email, fold(email)))
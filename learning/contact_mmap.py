@@ -0,0 +1,337 @@
+# Memory-mapped contact file
+# MappedContacts keeps the contact book in a file with one JSON record per line:
+#     {"name": "Alice", "phone": "111", "email": "a@b.com"}
+#     {"name": "Bob", "deleted": true}
+# plus a small "sidecar" index file that remembers where (at which byte) each
+# name's latest record starts.
+# - Opening the book only maps the file into memory (mmap); nothing is decoded.
+# - A contact is decoded from its line only when it is looked at.
+# - Changes are appended to the end of the file, so each edit costs the same
+#   no matter how big the book is. Old and deleted records are cleaned up by compact().
+# - Search indexes (names, phones, emails) are only built the first time a search needs them.
+
+import json
+import mmap
+import os
+from collections.abc import MutableMapping
+
+from contact_index import NameIndex, add_to_group, fold, members, remove_from_group
+
+
+class MappedContacts(NameIndex, MutableMapping):
+    """
+    A dict-like contact book backed by a memory-mapped, record-per-line file.
+    - offsets: name -> byte offset of that contact's line (read from the sidecar
+      the first time a name is needed, not at startup).
+    - Name searches use NameIndex, which is only built the first time a name
+      search is made: opening, listing or editing the book never pays for it.
+    - by_phone / by_email: phone -> names and folded email -> names, like
+      IndexedContacts has. Building them means decoding every contact once, so
+      that only happens the first time with_phone() or with_email() is called.
+    """
+
+    def __init__(self, path, compact_after=1000):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.compact_after = compact_after
+        self.map = None
+        self.mapped_size = 0
+        self.offsets = None
+        self.names_loaded = False
+        self.by_phone = None
+        self.by_email = None
+        self.records = 0
+        self.data_out = None
+        self.index_out = None
+        if not os.path.exists(path):
+            open(path, "wb").close()
+        self.size = os.path.getsize(path)
+
+    # --- reading the file ---
+
+    def _mapping(self):
+        """Return an up-to-date mmap of the data file (remapped after appends)."""
+        self._flush()
+        if self.map is None or self.mapped_size != self.size:
+            if self.map is not None:
+                self.map.close()
+            self.map = None
+            self.mapped_size = self.size
+            if self.size:
+                with open(self.path, "rb") as f:
+                    self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.map
+
+    def _record_at(self, offset):
+        """Decode the single JSON line that starts at offset."""
+        data = self._mapping()
+        end = data.find(b"\n", offset)
+        return json.loads(data[offset:end])
+
+    def _lines_from(self, start):
+        """Yield (offset, line) for each complete line from start to the end of the file."""
+        data = self._mapping()
+        offset = start
+        while data is not None and offset < self.size:
+            end = data.find(b"\n", offset)
+            if end == -1:
+                break
+            yield offset, data[offset:end]
+            offset = end + 1
+
+    def _load_index(self):
+        """
+        Build offsets the first time they are needed.
+        - Normally this only reads the sidecar file: one short line per change.
+        - Any records the sidecar missed (e.g. after a crash) are found by
+          scanning the data file from where the sidecar stops.
+        """
+        if self.offsets is not None:
+            return
+        self.offsets = {}
+        self.records = 0
+        covered = 0
+        sidecar_ok = True
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        offset, op, name = line.rstrip("\n").split(" ", 2)
+                        offset, name = int(offset), json.loads(name)
+                    except ValueError:
+                        sidecar_ok = False
+                        break
+                    if offset >= self.size:
+                        sidecar_ok = False
+                        break
+                    self._apply(op, name, offset)
+                    covered = offset
+            if self.records:
+                covered = self._mapping().find(b"\n", covered) + 1
+        missed = []
+        for offset, line in self._lines_from(covered):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            op = "-" if record.get("deleted") else "+"
+            self._apply(op, record["name"], offset)
+            missed.append(self._index_line(offset, op, record["name"]))
+            covered = offset + len(line) + 1
+        if covered < self.size:
+            # A half-written last line from a crash: cut it off.
+            self.close()
+            with open(self.path, "r+b") as f:
+                f.truncate(covered)
+            self.size = covered
+        if not sidecar_ok:
+            # The sidecar had junk in it: write a fresh one from what we found.
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                for name, offset in self.offsets.items():
+                    f.write(self._index_line(offset, "+", name))
+        elif missed:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write("".join(missed))
+
+    def _load_names(self):
+        """Build the name indexes (see NameIndex) the first time a name search needs them."""
+        self._load_index()
+        if self.names_loaded:
+            return
+        self._init_names()
+        for name in self.offsets:
+            self._add_name(name, keep_sorted=False)
+        self.sorted_names.sort()
+        self.names_loaded = True
+
+    def _load_details(self):
+        """Build by_phone and by_email (decoding each live contact once) the first time they are needed."""
+        self._load_index()
+        if self.by_phone is not None:
+            return
+        self.by_phone = {}
+        self.by_email = {}
+        for name, info in self.items():
+            self._index_details(name, info)
+
+    def _index_details(self, name, info):
+        add_to_group(self.by_phone, info["phone"].strip(), name)
+        add_to_group(self.by_email, fold(info["email"]), name)
+
+    def _unindex_details(self, name):
+        info = self[name]
+        remove_from_group(self.by_phone, info["phone"].strip(), name)
+        remove_from_group(self.by_email, fold(info["email"]), name)
+
+    def _apply(self, op, name, offset):
+        self.records += 1
+        if op == "+":
+            self.offsets[name] = offset
+        else:
+            self.offsets.pop(name, None)
+
+    @staticmethod
+    def _index_line(offset, op, name):
+        return f"{offset} {op} {json.dumps(name)}\n"
+
+    # --- writing the file ---
+
+    def _append(self, record, op):
+        """Append one record to the data file and one line to the sidecar."""
+        if self.data_out is None:
+            self.data_out = open(self.path, "ab")
+            self.index_out = open(self.index_path, "a", encoding="utf-8")
+        line = (json.dumps(record) + "\n").encode("ascii")
+        offset = self.size
+        self.data_out.write(line)
+        self.index_out.write(self._index_line(offset, op, record["name"]))
+        self.size += len(line)
+        self._apply(op, record["name"], offset)
+
+    def _flush(self):
+        if self.data_out is not None:
+            self.data_out.flush()
+            self.index_out.flush()
+
+    def _close_files(self):
+        if self.data_out is not None:
+            self.data_out.close()
+            self.index_out.close()
+            self.data_out = self.index_out = None
+
+    def commit(self):
+        """Make sure every change is written out, and compact if the file is mostly old records."""
+        self._flush()
+        if self.offsets is not None:
+            dead = self.records - len(self.offsets)
+            if dead >= max(self.compact_after, len(self.offsets)):
+                self.compact()
+
+    def compact(self):
+        """Rewrite the file with only the live records (and a matching sidecar)."""
+        self._load_index()
+        data = self._mapping()
+        new_offsets = {}
+        offset = 0
+        with open(self.path + ".tmp", "wb") as out, open(self.index_path + ".tmp", "w", encoding="utf-8") as idx:
+            for name, old in self.offsets.items():
+                end = data.find(b"\n", old) + 1
+                line = data[old:end]
+                out.write(line)
+                idx.write(self._index_line(offset, "+", name))
+                new_offsets[name] = offset
+                offset += len(line)
+        self._close_files()
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        os.replace(self.path + ".tmp", self.path)
+        os.replace(self.index_path + ".tmp", self.index_path)
+        self.offsets = new_offsets
+        self.records = len(new_offsets)
+        self.size = offset
+
+    def close(self):
+        self._close_files()
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    # --- dict-like behaviour ---
+
+    def __getitem__(self, name):
+        self._load_index()
+        offset = self.offsets.get(name)
+        if offset is None:
+            raise KeyError(name)
+        record = self._record_at(offset)
+        return {"phone": record["phone"], "email": record["email"]}
+
+    def __setitem__(self, name, info):
+        self._load_index()
+        # The search indexes only need keeping up to date once they have been built.
+        if name in self.offsets:
+            if self.names_loaded:
+                self._remove_name(name)
+            if self.by_phone is not None:
+                self._unindex_details(name)
+        # Spaces around a phone or email are never wanted, and would stop searches finding it.
+        info = {"phone": info["phone"].strip(), "email": info["email"].strip()}
+        self._append({"name": name, "phone": info["phone"], "email": info["email"]}, "+")
+        if self.names_loaded:
+            self._add_name(name)
+        if self.by_phone is not None:
+            self._index_details(name, info)
+
+    def __delitem__(self, name):
+        self._load_index()
+        if name not in self.offsets:
+            raise KeyError(name)
+        if self.by_phone is not None:
+            self._unindex_details(name)
+        self._append({"name": name, "deleted": True}, "-")
+        if self.names_loaded:
+            self._remove_name(name)
+
+    def __contains__(self, name):
+        self._load_index()
+        return name in self.offsets
+
+    def __iter__(self):
+        self._load_index()
+        return iter(list(self.offsets))
+
+    def __len__(self):
+        self._load_index()
+        return len(self.offsets)
+
+    def __bool__(self):
+        self._load_index()
+        return bool(self.offsets)
+
+    def items(self):
+        """
+        Stream (name, info) pairs straight from the mapped file.
+        Only the name -> offset index is held in memory; each contact is decoded as it is yielded.
+        """
+        self._load_index()
+        for name, offset in list(self.offsets.items()):
+            record = self._record_at(offset)
+            yield name, {"phone": record["phone"], "email": record["email"]}
+
+    def clear(self):
+        """Delete every contact by emptying both files."""
+        self.close()
+        open(self.path, "wb").close()
+        open(self.index_path, "w").close()
+        self.size = 0
+        self.offsets = {}
+        self.records = 0
+        self._init_names()
+        self.names_loaded = True
+        self.by_phone = {}
+        self.by_email = {}
+
+    # --- searching ---
+
+    def find(self, name):
+        self._load_names()
+        return super().find(name)
+
+    def starting_with(self, prefix, limit=None):
+        self._load_names()
+        return super().starting_with(prefix, limit)
+
+    def fuzzy_find(self, name, limit=5, cutoff=0.6):
+        self._load_names()
+        return super().fuzzy_find(name, limit, cutoff)
+
+    def with_phone(self, phone):
+        """Names of contacts that have this phone number."""
+        self._load_details()
+        return sorted(members(self.by_phone, phone.strip()))
+
+    def with_email(self, email):
+        """Names of contacts that have this email (ignoring case)."""
+        self._load_details()
+        return sorted(members(self.by_email, fold(email)))
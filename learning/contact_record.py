@@ -0,0 +1,36 @@
+# Compact contact records
+# A contact's details are normally a small dict: {"phone": "111", "email": "a@b.com"}.
+# Every dict carries a hash table, which costs about 184 bytes even for two keys.
+# Contact holds the same two values in __slots__ instead (about 48 bytes), and still
+# behaves like a read-only dict: info["phone"], info.get("email"), dict(info), info == {...}.
+
+from slotted_record import SlottedRecord, record_to_json
+
+FIELDS = ("phone", "email")
+
+
+class Contact(SlottedRecord):
+    """A contact's phone and email, stored without a per-object dict (see slotted_record.py)."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, phone, email):
+        self.phone = phone
+        self.email = email
+
+    @classmethod
+    def from_info(cls, info):
+        """Turn {"phone": ..., "email": ...} (or another Contact) into a Contact."""
+        if isinstance(info, cls):
+            return info
+        return cls(info["phone"], info["email"])
+
+    @classmethod
+    def matches(cls, obj):
+        # The outer {name: details} dict of the book is left alone (its values are not strings).
+        return super().matches(obj) and all(isinstance(value, str) for value in obj.values())
+
+
+# json.dump(default=...) and json.load(object_hook=...) hooks for the contacts file.
+contact_to_json = record_to_json
+contact_from_json = Contact.from_json
@@ -0,0 +1,158 @@
+# SQLite storage for the contact book
+# SqliteContacts looks like the normal contacts dict ({name: {"phone": ..., "email": ...}})
+# but keeps everything in a SQLite database file instead of memory.
+# - Nothing is loaded at startup; each lookup is a small query.
+# - Indexed columns make name, phone and email searches fast.
+# - Changes are grouped in a transaction and saved with commit().
+
+import sqlite3
+from collections.abc import MutableMapping
+from difflib import get_close_matches
+
+from contact_index import FUZZY_SHORTLIST, fold, trigrams
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    name TEXT PRIMARY KEY,
+    phone TEXT NOT NULL,
+    email TEXT NOT NULL,
+    folded_name TEXT NOT NULL,
+    folded_email TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contacts_folded_name ON contacts (folded_name);
+CREATE INDEX IF NOT EXISTS contacts_phone ON contacts (phone);
+CREATE INDEX IF NOT EXISTS contacts_folded_email ON contacts (folded_email);
+CREATE TABLE IF NOT EXISTS grams (
+    gram TEXT NOT NULL,
+    folded_name TEXT NOT NULL,
+    PRIMARY KEY (gram, folded_name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS grams_folded_name ON grams (folded_name);
+"""
+
+# Sorts after every real character, so "abc" <= name < "abc" + PREFIX_END
+# selects exactly the names starting with "abc".
+PREFIX_END = "\U0010ffff"
+
+
+class SqliteContacts(MutableMapping):
+    """
+    A dict-like contact book stored in SQLite.
+    It offers the same search methods as IndexedContacts (find, starting_with,
+    fuzzy_find, with_phone, with_email), answered by indexed queries.
+    Call commit() to save changes; until then they can be undone with rollback().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def __getitem__(self, name):
+        row = self.db.execute("SELECT phone, email FROM contacts WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return {"phone": row[0], "email": row[1]}
+
+    def __setitem__(self, name, info):
+        if name in self:
+            del self[name]
+        folded = fold(name)
+        self.db.execute(
+            "INSERT INTO contacts (name, phone, email, folded_name, folded_email) VALUES (?, ?, ?, ?, ?)",
+            (name, info["phone"], info["email"], folded, fold(info["email"])),
+        )
+        self.db.executemany(
+            "INSERT OR IGNORE INTO grams (gram, folded_name) VALUES (?, ?)",
+            [(gram, folded) for gram in trigrams(folded)],
+        )
+
+    def __delitem__(self, name):
+        row = self.db.execute("SELECT folded_name FROM contacts WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        folded = row[0]
+        self.db.execute("DELETE FROM contacts WHERE name = ?", (name,))
+        # Other names can fold to the same text ("Bob" and "bob"); keep the trigrams while one is left.
+        if self.db.execute("SELECT 1 FROM contacts WHERE folded_name = ? LIMIT 1", (folded,)).fetchone() is None:
+            self.db.execute("DELETE FROM grams WHERE folded_name = ?", (folded,))
+
+    def __iter__(self):
+        for (name,) in self.db.execute("SELECT name FROM contacts"):
+            yield name
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+
+    def __bool__(self):
+        # Cheaper than counting every row just to see if the book is empty.
+        return self.db.execute("SELECT 1 FROM contacts LIMIT 1").fetchone() is not None
+
+    def items(self):
+        """Stream (name, info) pairs straight from the database, one row at a time."""
+        for name, phone, email in self.db.execute("SELECT name, phone, email FROM contacts"):
+            yield name, {"phone": phone, "email": email}
+
+    def clear(self):
+        """Delete every contact (one statement, instead of one delete per contact)."""
+        self.db.execute("DELETE FROM contacts")
+        self.db.execute("DELETE FROM grams")
+
+    def commit(self):
+        """Save all changes made since the last commit."""
+        self.db.commit()
+
+    def rollback(self):
+        """Throw away all changes made since the last commit."""
+        self.db.rollback()
+
+    def close(self):
+        self.db.close()
+
+    # --- searching ---
+
+    def names_where(self, sql, params):
+        return [row[0] for row in self.db.execute(sql, params)]
+
+    def find(self, name):
+        """Names that match name exactly, ignoring upper/lower case."""
+        return self.names_where("SELECT name FROM contacts WHERE folded_name = ? ORDER BY name", (fold(name),))
+
+    def starting_with(self, prefix, limit=None):
+        """Names that start with prefix (ignoring case), in alphabetical order."""
+        prefix = fold(prefix)
+        return self.names_where(
+            "SELECT name FROM contacts WHERE folded_name >= ? AND folded_name < ? "
+            "ORDER BY folded_name, name LIMIT ?",
+            (prefix, prefix + PREFIX_END, -1 if limit is None else limit),
+        )
+
+    def fuzzy_find(self, name, limit=5, cutoff=0.6):
+        """
+        Names that look like name even with typos (see IndexedContacts.fuzzy_find).
+        The same shortlist is made in one query: names sharing a third of the
+        trigrams of the query or of themselves (whichever has more), best first,
+        at most FUZZY_SHORTLIST of them.
+        """
+        grams = sorted(trigrams(name))
+        needed = max(1, len(grams) // 3)
+        marks = ", ".join("?" * len(grams))
+        shortlist = self.names_where(
+            "SELECT folded_name FROM ("
+            "  SELECT folded_name, shared,"
+            "         MAX(?, (SELECT COUNT(*) FROM grams AS own WHERE own.folded_name = matched.folded_name)) AS most"
+            f"  FROM (SELECT folded_name, COUNT(*) AS shared FROM grams WHERE gram IN ({marks})"
+            "        GROUP BY folded_name HAVING COUNT(*) >= ?) AS matched"
+            ") WHERE shared >= most / 3 ORDER BY CAST(shared AS REAL) / most DESC LIMIT ?",
+            (len(grams), *grams, needed, FUZZY_SHORTLIST),
+        )
+        best = get_close_matches(fold(name), shortlist, n=limit, cutoff=cutoff)
+        return [real for folded in best for real in self.find(folded)]
+
+    def with_phone(self, phone):
+        """Names of contacts that have this phone number."""
+        return self.names_where("SELECT name FROM contacts WHERE phone = ? ORDER BY name", (phone.strip(),))
+
+    def with_email(self, email):
+        """Names of contacts that have this email (ignoring case)."""
+        return self.names_where("SELECT name FROM contacts WHERE folded_email = ? ORDER BY name", (fold(email),))
@@ -0,0 +1,136 @@
+# Contact Import / Export
+# Moves contacts in and out of the contact book in bulk, using CSV files
+# (name,phone,email) or vCard files (.vcf).
+# Files are read and written one contact at a time, so even a file with a
+# million contacts never has to fit in memory all at once.
+
+import csv
+
+# Characters allowed in a phone number besides digits.
+PHONE_EXTRA_CHARS = set("+-(). ")
+
+
+def is_vcard(path):
+    """vCard files usually end in .vcf or .vcard; everything else is treated as CSV."""
+    return path.lower().endswith((".vcf", ".vcard"))
+
+
+def read_csv_rows(path):
+    """
+    Yield (name, phone, email) for each row of a CSV file.
+    - If the first row is a header (name,phone,email) it is skipped.
+    - Missing columns come back as empty strings.
+    """
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        for i, row in enumerate(reader):
+            if i == 0 and [cell.strip().lower() for cell in row[:3]] == ["name", "phone", "email"]:
+                continue
+            row = (row + ["", "", ""])[:3]
+            yield row[0], row[1], row[2]
+
+
+def read_vcard_rows(path):
+    """
+    Yield (name, phone, email) for each BEGIN:VCARD ... END:VCARD block.
+    - We only read the FN (full name), first TEL and first EMAIL lines.
+    - Lines like "TEL;TYPE=cell:123" carry extra settings before the ":"; we ignore them.
+    """
+    name = phone = email = ""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            key, _, value = line.partition(":")
+            key = key.split(";")[0].upper()
+            if key == "BEGIN":
+                name = phone = email = ""
+            elif key == "FN":
+                name = value
+            elif key == "TEL" and not phone:
+                phone = value
+            elif key == "EMAIL" and not email:
+                email = value
+            elif key == "END":
+                yield name, phone, email
+
+
+def read_rows(path):
+    """Pick the right reader for the file type."""
+    if is_vcard(path):
+        return read_vcard_rows(path)
+    return read_csv_rows(path)
+
+
+def is_valid(name, phone, email):
+    """A row needs a name; phone and email may be empty but must look sensible."""
+    if not name:
+        return False
+    if phone and not all(ch.isdigit() or ch in PHONE_EXTRA_CHARS for ch in phone):
+        return False
+    if email and "@" not in email:
+        return False
+    return True
+
+
+def import_rows(contacts, rows, commit, batch_size=10000):
+    """
+    Add every valid, new row to contacts and return counts of what happened.
+    - Rows whose name is already in the book (or earlier in the file) are skipped.
+    - Instead of saving after every row, the added names are collected and
+      commit(changes) is called once per batch_size rows and once at the end.
+      changes is a list of ("add", name) pairs.
+    """
+    counts = {"added": 0, "invalid": 0, "duplicate": 0}
+    changes = []
+    for name, phone, email in rows:
+        name, phone, email = name.strip(), phone.strip(), email.strip()
+        if not is_valid(name, phone, email):
+            counts["invalid"] += 1
+            continue
+        if name in contacts:
+            counts["duplicate"] += 1
+            continue
+        contacts[name] = {"phone": phone, "email": email}
+        changes.append(("add", name))
+        counts["added"] += 1
+        if len(changes) >= batch_size:
+            commit(changes)
+            changes = []
+    if changes:
+        commit(changes)
+    return counts
+
+
+def export_csv(contacts, path):
+    """Write contacts to a CSV file with a name,phone,email header. Returns how many were written."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "phone", "email"])
+        for name, info in contacts.items():
+            writer.writerow([name, info["phone"], info["email"]])
+            count += 1
+    return count
+
+
+def export_vcard(contacts, path):
+    """Write contacts as vCard 3.0 entries. Returns how many were written."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for name, info in contacts.items():
+            f.write("BEGIN:VCARD\nVERSION:3.0\n")
+            f.write(f"FN:{name}\n")
+            if info["phone"]:
+                f.write(f"TEL:{info['phone']}\n")
+            if info["email"]:
+                f.write(f"EMAIL:{info['email']}\n")
+            f.write("END:VCARD\n")
+            count += 1
+    return count
+
+
+def export_contacts(contacts, path):
+    """Pick the right writer for the file type."""
+    if is_vcard(path):
+        return export_vcard(contacts, path)
+    return export_csv(contacts, path)
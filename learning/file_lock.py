@@ -0,0 +1,45 @@
+# File helpers for programs that share data files
+# - locked(path): only one program at a time may hold the lock, so two programs
+#   never write the same file at the same moment.
+# - write_atomically(path, write): the file is either fully old or fully new,
+#   even if the program crashes halfway through writing.
+
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no fcntl; there locked() simply doesn't block other programs.
+    fcntl = None
+
+
+@contextmanager
+def locked(path):
+    """
+    Hold an exclusive lock on path + ".lock" for the duration of a `with` block.
+    The lock is "advisory": it only stops other programs that also use locked().
+    """
+    with open(path + ".lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def write_atomically(path, write):
+    """
+    Create a new version of path without ever leaving it half-written.
+    - write(f) is called with a temporary file open for writing.
+    - The data is flushed to disk, then os.replace() swaps the temp file in
+      with a single rename, which other programs see as all-or-nothing.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
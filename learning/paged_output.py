@@ -0,0 +1,57 @@
+"""
+Showing long lists a page at a time.
+Used by view_tasks() in todo_list.py and view_contacts() in contact_book.py.
+
+Calling print() once per line is slow for big lists (each call is a separate write
+to the terminal) and floods the screen. show_pages() instead:
+- builds a whole page of lines and writes it with a single write() call,
+- stops after each page and asks whether to go on, jump somewhere, or stop,
+- only ever holds one page in memory, because it walks the items with
+  itertools.islice instead of copying them into a list first.
+"""
+
+import sys
+from itertools import islice
+
+# How many items one page shows.
+PAGE_SIZE = 20
+# With page_size=0 everything is shown without stopping, written this many lines at a time.
+CHUNK_LINES = 5000
+
+
+def show_pages(get_items, total, format_item, page_size=PAGE_SIZE, start=0):
+    """
+    Write format_item(item) for each item, page by page.
+    - get_items: a function that starts a new pass over the items, e.g. contacts.items.
+      (Some stores, like SQLite, stream their items and can only be walked once per call.)
+    - total:     how many items there are, for the "21-40 of 500" line.
+    - start:     how many items to skip first (0 = start at the beginning).
+    - page_size=0 shows everything at once (still written in big chunks).
+    Between pages the user can press Enter for the next page, type a position in the
+    list (counting from 1, as in "21-40 of 500") to jump there, or type q to stop.
+    Returns how far we got (an item position).
+    """
+    size = page_size or CHUNK_LINES
+    rows = islice(get_items(), start, None)
+    position = start
+    while True:
+        page = [format_item(item) for item in islice(rows, size)]
+        if page:
+            sys.stdout.write("\n".join(page) + "\n")
+        page_start, position = position, position + len(page)
+        if len(page) < size or position >= total:
+            return position
+        if not page_size:
+            continue
+        try:
+            reply = input(f"-- {page_start + 1}-{position} of {total}. "
+                          "Enter = next page, a number = jump to that position in the list, q = stop: ").strip().lower()
+        except EOFError:
+            # Input is piped in and has run out, so nobody is there to ask.
+            return position
+        if reply == "q":
+            return position
+        if reply.isdigit():
+            # Going backwards means starting a new pass over the items from the beginning.
+            position = min(max(int(reply), 1), total) - 1
+            rows = islice(get_items(), position, None)
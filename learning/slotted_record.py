@@ -0,0 +1,62 @@
+# Small read-only records
+# A plain dict carries a hash table, which costs about 184 bytes even for two keys.
+# SlottedRecord keeps its values in __slots__ instead, and still behaves like a
+# read-only dict: record["phone"], record.get("email"), dict(record), record == {...}.
+# Contact (contact_record.py) and Conditions (weather_parse.py) are built on it.
+
+from collections.abc import Mapping
+
+
+class SlottedRecord(Mapping):
+    """
+    Base class for records stored without a per-object dict.
+    - A subclass lists its fields in __slots__, which tells Python to reserve
+      exactly those attribute slots and no __dict__.
+    - Mapping gives us keys(), items(), get(), == and `in` for free, based on
+      __getitem__, __iter__ and __len__ below.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def matches(cls, obj):
+        """Whether a dict read from JSON holds exactly this record's fields."""
+        return obj.keys() == set(cls.__slots__)
+
+    @classmethod
+    def from_json(cls, obj):
+        """
+        `object_hook` for json.load(): turns each dict that matches() into a record
+        as it is read, so the full set of plain dicts never exists in memory at once.
+        Any other dict is left alone.
+        """
+        if cls.matches(obj):
+            return cls(**obj)
+        return obj
+
+
+def record_to_json(value):
+    """
+    `default` hook for json.dump(): writes a record exactly like the dict it replaces,
+    so the file on disk looks the same whichever type is used in memory.
+    """
+    if isinstance(value, SlottedRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
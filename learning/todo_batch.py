@@ -0,0 +1,148 @@
+"""
+Batch mode for the To-Do List App.
+Instead of typing into the menu, give the app a file of commands (or pipe them in)
+and it runs them all at full speed:
+
+    python todo_list.py --batch commands.txt
+    some_program | python todo_list.py --batch -
+
+Each line is one command, either as plain text:
+    add Buy milk
+    complete 3
+    remove 3
+    schedule 4 1 2026-01-31     (priority and due date; use - for "none")
+    list                        (or: list pending / list done)
+    next 5
+    search milk eggs            (tasks with both words)
+    undo / redo
+or as a JSON object (handy when another program writes the commands):
+    {"cmd": "add", "title": "Buy milk", "priority": 2, "due": "2026-01-31"}
+    {"cmd": "complete", "id": 3}
+    {"cmd": "search", "query": "milk", "status": "pending"}
+
+Output is collected and written in large chunks rather than one print() per line,
+and a summary with the number of commands per second goes to stderr at the end.
+"""
+
+import json
+import sys
+import time
+
+from todo_store import check_schedule
+
+# Write collected output once this many lines have piled up.
+OUTPUT_CHUNK_LINES = 10000
+
+
+def parse_command(line):
+    """Turn one input line into a dict like {"cmd": "add", "title": "..."}. Returns None for blank lines."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        return json.loads(line)
+    cmd, _, rest = line.partition(" ")
+    cmd = cmd.lower()
+    rest = rest.strip()
+    if cmd == "add":
+        return {"cmd": "add", "title": rest}
+    if cmd in ("remove", "complete"):
+        return {"cmd": cmd, "id": int(rest)}
+    if cmd == "schedule":
+        task_id, priority, due = rest.split()
+        return {"cmd": "schedule", "id": int(task_id),
+                "priority": None if priority == "-" else int(priority),
+                "due": None if due == "-" else due}
+    if cmd == "list":
+        return {"cmd": "list", "status": rest or "all"}
+    if cmd == "next":
+        return {"cmd": "next", "n": int(rest) if rest else 5}
+    if cmd == "search":
+        return {"cmd": "search", "query": rest}
+    if cmd in ("undo", "redo"):
+        return {"cmd": cmd}
+    raise ValueError(f"unknown command '{cmd}'")
+
+
+def run_command(tasks, command, out):
+    """Apply one parsed command to tasks, adding any output lines to the out list."""
+    cmd = command["cmd"]
+    if cmd == "add":
+        title = command["title"].strip()
+        if not title:
+            raise ValueError("task cannot be empty")
+        # Check the schedule first, so a bad one doesn't leave a half-made task behind.
+        priority, due = check_schedule(command.get("priority"), command.get("due"))
+        task = tasks.add(title)
+        if priority is not None or due is not None:
+            tasks.set_schedule(task.id, priority, due)
+        out.append(f"added {task.id}")
+    elif cmd == "remove":
+        if tasks.remove(command["id"]) is None:
+            raise ValueError(f"no task {command['id']}")
+    elif cmd == "complete":
+        task = tasks.get(command["id"])
+        if task is None:
+            raise ValueError(f"no task {command['id']}")
+        tasks.complete(task)
+    elif cmd == "schedule":
+        task = tasks.get(command["id"])
+        if task is None:
+            raise ValueError(f"no task {command['id']}")
+        tasks.set_schedule(task.id, *check_schedule(command.get("priority"), command.get("due")))
+    elif cmd == "list":
+        status = command.get("status", "all")
+        selected = {"all": tasks, "pending": tasks.pending.values(), "done": tasks.done.values()}[status]
+        out.extend(f"{task.id}. {task}" for task in selected)
+    elif cmd == "next":
+        out.extend(f"{task.id}. {task}" for task in tasks.next_due(command.get("n", 5)))
+    elif cmd == "search":
+        found = tasks.search(command["query"], command.get("status"))
+        out.extend(f"{task.id}. {task}" for task in found)
+    elif cmd in ("undo", "redo"):
+        if tasks.history is None:
+            raise ValueError("no history to undo/redo with")
+        result = tasks.history.undo() if cmd == "undo" else tasks.history.redo()
+        if result is None:
+            raise ValueError(f"nothing to {cmd}")
+        out.append(f"{cmd} {result[0]} {result[1].id}")
+    else:
+        raise ValueError(f"unknown command '{cmd}'")
+
+
+def run_batch(tasks, lines, output=sys.stdout):
+    """
+    Run every command in lines (any iterable of strings) and return how many ran.
+    - Bad lines are reported as "line N: error ..." and skipped; the rest still run.
+    - The journal is flushed once at the end instead of after every change.
+    """
+    out = []
+    count = 0
+    start = time.perf_counter()
+    journal = tasks.journal
+    if journal is not None:
+        journal.autoflush = False
+    try:
+        for number, line in enumerate(lines, start=1):
+            try:
+                command = parse_command(line)
+                if command is None:
+                    continue
+                run_command(tasks, command, out)
+                count += 1
+            except (ValueError, KeyError, TypeError) as e:
+                out.append(f"line {number}: error: {e}")
+            if len(out) >= OUTPUT_CHUNK_LINES:
+                output.write("\n".join(out) + "\n")
+                out = []
+    finally:
+        if journal is not None:
+            journal.flush()
+            journal.autoflush = True
+    if out:
+        output.write("\n".join(out) + "\n")
+    output.flush()
+    seconds = time.perf_counter() - start
+    rate = count / seconds if seconds > 0 else float("inf")
+    print(f"Ran {count} commands in {seconds:.3f}s ({rate:,.0f} commands/s).", file=sys.stderr)
+    return count
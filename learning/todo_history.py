@@ -0,0 +1,94 @@
+"""
+Undo and redo for the To-Do List App.
+Saving a copy of the whole list before every change would make each change cost
+as much as the list is long. Instead, just before a change is made we write down
+the change that would reverse it (its "inverse"):
+    add task 7          is undone by   remove task 7
+    remove task 7       is undone by   add task 7 back (same title, dates, ...)
+    complete task 7     is undone by   reopen task 7
+    schedule task 7     is undone by   schedule task 7 with its old priority/due date
+Each step of history is therefore a couple of small records, whatever the size of the list.
+"""
+
+from collections import deque
+
+# How many changes can be undone, unless History is told otherwise.
+HISTORY_DEPTH = 100
+
+
+class History:
+    """
+    The undo and redo stacks of one TaskList.
+    - undo_stack: (changes, inverse) pairs, newest last. It is a deque with a
+      maxlen, so once it is full the oldest step is dropped automatically.
+    - redo_stack: steps that were undone and can be made again. Making a brand
+      new change empties it, like in a text editor.
+    Undo and redo go through TaskList.apply(), so they are saved in the journal
+    like any other change.
+    """
+
+    def __init__(self, tasks, depth=HISTORY_DEPTH):
+        self.tasks = tasks
+        self.undo_stack = deque(maxlen=depth)
+        self.redo_stack = []
+        self.busy = False
+        tasks.history = self
+
+    def inverse(self, record):
+        """The records that reverse record, worked out before it is applied ([] if it changes nothing)."""
+        task = self.tasks.get(record["id"])
+        op = record["op"]
+        if op == "add":
+            return [] if task is not None else [{"op": "remove", "id": record["id"]}]
+        if task is None:
+            return []
+        if op == "remove":
+            undo = [{"op": "add", "id": task.id, "title": task.title, "created": task.created,
+                     "priority": task.priority, "due": task.due}]
+            if task.done:
+                undo.append({"op": "complete", "id": task.id, "at": task.completed})
+            return undo
+        if op == "complete":
+            return [] if task.done else [{"op": "reopen", "id": task.id}]
+        if op == "reopen":
+            return [{"op": "complete", "id": task.id, "at": task.completed}] if task.done else []
+        if op == "schedule":
+            return [{"op": "schedule", "id": task.id, "priority": task.priority, "due": task.due}]
+        return []
+
+    def record(self, record):
+        """Called by TaskList.apply() just before it makes a change."""
+        if self.busy:
+            return
+        inverse = self.inverse(record)
+        if inverse:
+            self.undo_stack.append(([record], inverse))
+            self.redo_stack.clear()
+
+    def _run(self, records):
+        """Apply records without adding them to the history; returns the last task touched."""
+        self.busy = True
+        try:
+            for record in records:
+                task = self.tasks.apply(record)
+        finally:
+            self.busy = False
+        return task
+
+    def undo(self):
+        """Reverse the newest change. Returns (op, task) for the change undone, or None if there is nothing to undo."""
+        if not self.undo_stack:
+            return None
+        changes, inverse = self.undo_stack.pop()
+        task = self._run(inverse)
+        self.redo_stack.append((changes, inverse))
+        return changes[0]["op"], task
+
+    def redo(self):
+        """Make the newest undone change again. Returns (op, task), or None if there is nothing to redo."""
+        if not self.redo_stack:
+            return None
+        changes, inverse = self.redo_stack.pop()
+        task = self._run(changes)
+        self.undo_stack.append((changes, inverse))
+        return changes[0]["op"], task
@@ -0,0 +1,97 @@
+"""
+Saving the to-do list between runs.
+Rewriting the whole list after every change gets slow once it is long, so:
+- every change is appended to a journal file as one line of JSON (a "record"),
+- a snapshot file holds the whole list as it was at some earlier point,
+- at startup we load the snapshot and replay the journal on top of it,
+- every so often we "compact": write a fresh snapshot and empty the journal.
+Each change is flushed to the file straight away, so a crash loses at most the
+change that was being written at that moment. Batch mode (todo_batch.py) turns
+that off with autoflush = False and calls flush() once at the end instead.
+"""
+
+import json
+import os
+
+from file_lock import write_atomically
+
+
+class Journal:
+    """
+    Connects a TaskList to its snapshot and journal files.
+    Compaction happens once the journal holds at least `compact_after` records
+    and at least as many records as there are tasks, which keeps the average
+    cost of one change the same however long the list gets.
+    """
+
+    def __init__(self, tasks, path, snapshot_path, compact_after=1000):
+        self.tasks = tasks
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.compact_after = compact_after
+        self.records = 0
+        self.file = None
+        self.autoflush = True
+
+    def load(self):
+        """Fill self.tasks from the snapshot plus the journal, then start recording changes."""
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                self.tasks.load_dict(json.load(f))
+        self.records = self.replay()
+        self.tasks.journal = self
+
+    def replay(self):
+        """
+        Apply every record in the journal and return how many there were.
+        A last line cut off by a crash is trimmed, so the next append starts on a fresh line.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        count = 0
+        good_size = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self.tasks.apply(record, log=False)
+                count += 1
+                good_size += len(line)
+        if good_size < os.path.getsize(self.path):
+            os.truncate(self.path, good_size)
+        return count
+
+    def append(self, record):
+        """Write one record to the end of the journal (and compact if it has grown big)."""
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write(json.dumps(record) + "\n")
+        if self.autoflush:
+            self.file.flush()
+        self.records += 1
+        if self.records >= max(self.compact_after, len(self.tasks)):
+            self.compact()
+
+    def flush(self):
+        """Push any records still waiting in memory out to the journal file."""
+        if self.file is not None:
+            self.file.flush()
+
+    def compact(self):
+        """Save a fresh snapshot of the whole list and empty the journal."""
+        data = self.tasks.to_dict()
+        write_atomically(self.snapshot_path, lambda f: json.dump(data, f))
+        # If we crash right here the old journal is replayed onto the new snapshot;
+        # that's harmless because applying a record twice changes nothing.
+        self.close()
+        open(self.path, "w").close()
+        self.records = 0
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
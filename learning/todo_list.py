@@ -1,11 +1,34 @@
 """
 Command-Line To-Do List App
 A beginner-friendly app that lets you add, view, remove, and mark tasks as complete.
+
+Run `python todo_list.py --batch FILE` (or `--batch -` to read standard input)
+to run a file of commands without the menu; see todo_batch.py for the format.
 """
 
-# This list holds all our tasks. Each task is a string.
-# Completed tasks will have "[DONE] " at the start.
-tasks = []
+import sys
+from datetime import date
+
+from paged_output import PAGE_SIZE, show_pages
+from todo_batch import run_batch
+from todo_history import History
+from todo_journal import Journal
+from todo_store import TaskList
+
+# This holds all our tasks. Each task is a Task record (see todo_store.py) with an id,
+# a title and a done flag; completed tasks are shown with "[DONE] " in front.
+tasks = TaskList()
+
+# Tasks are saved here so they are still there next time (see todo_journal.py):
+# TASKS_FILE is a snapshot of the whole list, TASKS_JOURNAL lists the changes since.
+TASKS_FILE = "tasks.json"
+TASKS_JOURNAL = "tasks.journal"
+
+
+def load_tasks():
+    """Load the saved tasks into `tasks` and start saving (and remembering, for undo) every change."""
+    Journal(tasks, TASKS_JOURNAL, TASKS_FILE).load()
+    History(tasks)  # remembers the last HISTORY_DEPTH changes, see todo_history.py
 
 
 def show_menu():
@@ -17,9 +40,15 @@ def show_menu():
     print("2. View all tasks")
     print("3. Remove task")
     print("4. Mark task as complete")
-    print("5. Exit")
+    print("5. View pending or completed tasks")
+    print("6. Set priority / due date")
+    print("7. What's next?")
+    print("8. Search tasks")
+    print("9. Undo last change")
+    print("10. Redo")
+    print("11. Exit")
     print("=" * 40)
-    choice = input("Enter your choice (1-5): ").strip()
+    choice = input("Enter your choice (1-11): ").strip()
     return choice
 
 
@@ -29,18 +58,39 @@ def add_task():
     if task == "":
         print("  [!] Task cannot be empty. Nothing added.")
         return
-    tasks.append(task)
+    tasks.add(task)
     print(f"  ✓ Added: '{task}'")
 
 
-def view_tasks():
-    """Display all tasks with their numbers. Shows [DONE] for completed ones."""
+def view_tasks(page_size=PAGE_SIZE):
+    """
+    Display all tasks with their numbers, a page at a time. Shows [DONE] for completed ones.
+    A task's number is its id, so it stays the same when other tasks are removed.
+    page_size=0 lists them all without stopping to ask, for when we ask for a task number next.
+    """
     if not tasks:
         print("  No tasks yet. Add one with option 1!")
         return
     print("\n  Your tasks:")
-    for i, task in enumerate(tasks, start=1):
-        print(f"    {i}. {task}")
+    show_pages(lambda: iter(tasks), len(tasks), lambda task: f"    {task.id}. {task}", page_size)
+    print(f"  ({tasks.done_count} done, {tasks.pending_count} pending)")
+
+
+def view_by_status():
+    """Show only the pending tasks or only the completed ones."""
+    choice = input("  Show (p)ending or (c)ompleted tasks? ").strip().lower()
+    if choice not in ("p", "c"):
+        print("  [!] Please enter p or c.")
+        return
+    # tasks.pending / tasks.done only hold tasks with that status, so no need to check every task.
+    selected = tasks.pending if choice == "p" else tasks.done
+    label = "pending" if choice == "p" else "completed"
+    if not selected:
+        print(f"  No {label} tasks.")
+        return
+    print(f"\n  Your {label} tasks:")
+    for task in selected.values():
+        print(f"    {task.id}. {task.title}")
 
 
 def remove_task():
@@ -48,51 +98,141 @@ def remove_task():
     if not tasks:
         print("  No tasks to remove. Add some first!")
         return
-    view_tasks()
+    view_tasks(page_size=0)
     try:
         num_str = input("\n  Enter the number of the task to remove: ").strip()
         if not num_str:
             print("  [!] No number entered. Cancelled.")
             return
-        num = int(num_str)
-        if num < 1 or num > len(tasks):
-            print(f"  [!] Please enter a number between 1 and {len(tasks)}.")
+        removed = tasks.remove(int(num_str))
+        if removed is None:
+            print("  [!] There is no task with that number.")
             return
-        # Convert to 0-based index and remove
-        removed = tasks.pop(num - 1)
-        print(f"  ✓ Removed: '{removed}'")
+        print(f"  ✓ Removed: '{removed.title}'")
     except ValueError:
         print("  [!] Please enter a valid number.")
 
 
 def mark_complete():
-    """Show tasks, ask for a number, and add [DONE] prefix to that task."""
+    """Show tasks, ask for a number, and mark that task as done."""
     if not tasks:
         print("  No tasks to mark. Add some first!")
         return
-    view_tasks()
+    view_tasks(page_size=0)
     try:
         num_str = input("\n  Enter the number of the task to mark complete: ").strip()
         if not num_str:
             print("  [!] No number entered. Cancelled.")
             return
-        num = int(num_str)
-        if num < 1 or num > len(tasks):
-            print(f"  [!] Please enter a number between 1 and {len(tasks)}.")
+        task = tasks.get(int(num_str))
+        if task is None:
+            print("  [!] There is no task with that number.")
             return
-        idx = num - 1
-        task = tasks[idx]
-        if task.startswith("[DONE] "):
+        if not tasks.complete(task):
             print("  That task is already marked complete.")
             return
-        tasks[idx] = "[DONE] " + task
-        print(f"  ✓ Marked complete: '{task}'")
+        print(f"  ✓ Marked complete: '{task.title}'")
     except ValueError:
         print("  [!] Please enter a valid number.")
 
 
+def schedule_task():
+    """Ask for a task number, then its priority (1 = most important) and due date."""
+    if not tasks.pending:
+        print("  No pending tasks to schedule.")
+        return
+    try:
+        task = tasks.get(int(input("  Enter the number of the task: ").strip()))
+        if task is None or task.done:
+            print("  [!] There is no pending task with that number.")
+            return
+        priority_str = input("  Priority (1 = most important, blank for none): ").strip()
+        priority = int(priority_str) if priority_str else None
+        if priority is not None and priority < 1:
+            print("  [!] Priority must be 1 or more.")
+            return
+        due = input("  Due date (YYYY-MM-DD, blank for none): ").strip() or None
+        if due is not None:
+            # fromisoformat() raises ValueError for anything that isn't a real date.
+            due = date.fromisoformat(due).isoformat()
+    except ValueError:
+        print("  [!] Please enter a valid number or date.")
+        return
+    tasks.set_schedule(task.id, priority, due)
+    print(f"  ✓ Scheduled: {task}")
+
+
+def whats_next():
+    """Show overdue tasks, the next tasks due, and the most important ones."""
+    sections = [
+        ("Overdue", tasks.overdue()),
+        ("Due next", tasks.next_due(5)),
+        ("Top priority", tasks.top_priority(5)),
+    ]
+    if not any(found for _, found in sections):
+        print("  No pending tasks have a due date or priority. Set one with option 6!")
+        return
+    for heading, found in sections:
+        print(f"\n  {heading}:")
+        if not found:
+            print("    (none)")
+        for task in found:
+            print(f"    {task.id}. {task}")
+
+
+def batch(path):
+    """Run the commands in the file at path ("-" means standard input), then save."""
+    try:
+        if path == "-":
+            run_batch(tasks, sys.stdin)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                run_batch(tasks, f)
+    except IOError as e:
+        print(f"Error: could not read {path} ({e}).", file=sys.stderr)
+    tasks.journal.compact()
+    tasks.journal.close()
+
+
+def search_tasks():
+    """Ask for some words and show the tasks that contain all of them."""
+    query = input("  Search for: ").strip()
+    if not query:
+        print("  [!] Please enter at least one word.")
+        return
+    choice = input("  Only (p)ending, only (c)ompleted, or (a)ll? ").strip().lower()
+    status = {"p": "pending", "c": "done"}.get(choice)
+    found = tasks.search(query, status)
+    if not found:
+        print("  No matching tasks.")
+        return
+    print(f"\n  {len(found)} matching task(s):")
+    for task in found:
+        print(f"    {task.id}. {task}")
+
+
+def undo_or_redo(redo=False):
+    """Undo the last change (or redo the last undone one) and say what happened."""
+    result = tasks.history.redo() if redo else tasks.history.undo()
+    if result is None:
+        print(f"  Nothing to {'redo' if redo else 'undo'}.")
+        return
+    op, task = result
+    print(f"  ✓ {'Redid' if redo else 'Undid'} {op}: '{task.title}'")
+
+
 def main():
     """Run the app: show menu in a loop until user chooses Exit."""
+    try:
+        load_tasks()
+    except (ValueError, IOError) as e:
+        # Stop instead of starting empty and later saving over the damaged file.
+        print(f"Error: could not read the saved tasks ({e}).")
+        print(f"Please fix or remove {TASKS_FILE}, then run the app again.")
+        return
+    if len(sys.argv) == 3 and sys.argv[1] == "--batch":
+        batch(sys.argv[2])
+        return
     print("Welcome to the To-Do List App!")
     while True:
         choice = show_menu()
@@ -105,10 +245,25 @@ def main():
         elif choice == "4":
             mark_complete()
         elif choice == "5":
+            view_by_status()
+        elif choice == "6":
+            schedule_task()
+        elif choice == "7":
+            whats_next()
+        elif choice == "8":
+            search_tasks()
+        elif choice == "9":
+            undo_or_redo()
+        elif choice == "10":
+            undo_or_redo(redo=True)
+        elif choice == "11":
+            # Tidy up the saved files so the next start is quick.
+            tasks.journal.compact()
+            tasks.journal.close()
             print("\nGoodbye! Have a productive day.")
             break
         else:
-            print("  [!] Invalid choice. Please enter 1, 2, 3, 4, or 5.")
+            print("  [!] Invalid choice. Please enter a number from 1 to 11.")
 
 
 # This runs the app when you execute this file (e.g. python todo_list.py)
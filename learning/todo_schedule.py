@@ -0,0 +1,90 @@
+"""
+"What should I do next?" for the To-Do List App.
+Schedule keeps pending tasks that have a due date or priority in two heaps, so the
+next few due / most important tasks can be found without sorting the whole list.
+
+A heap (Python's heapq module) is a list arranged so the smallest item is always
+at position 0. Adding an item or taking the smallest one out costs O(log n).
+"""
+
+import heapq
+
+
+class Schedule:
+    """
+    Heaps of pending tasks by due date and by priority.
+    - current:       id -> (due, priority) for every pending task that has either.
+    - due_heap:      (due, id) pairs, earliest date first ("2026-01-31" strings sort by date).
+    - priority_heap: (priority, id) pairs, 1 = most important.
+    When a task is completed, removed or rescheduled we only update `current`;
+    its old heap entries stay behind ("lazy deletion") and are thrown away when
+    they reach the top. If too many pile up, the heaps are rebuilt from `current`.
+    """
+
+    def __init__(self):
+        self.current = {}
+        self.due_heap = []
+        self.priority_heap = []
+
+    def update(self, task):
+        """Call whenever a task is added or its due date/priority changes."""
+        if task.done or (task.due is None and task.priority is None):
+            self.discard(task.id)
+            return
+        self.current[task.id] = (task.due, task.priority)
+        if task.due is not None:
+            heapq.heappush(self.due_heap, (task.due, task.id))
+        if task.priority is not None:
+            heapq.heappush(self.priority_heap, (task.priority, task.id))
+        # Rescheduling the same task again and again also leaves stale entries behind.
+        self._tidy()
+
+    def discard(self, task_id):
+        """Call when a task is completed or removed."""
+        if self.current.pop(task_id, None) is not None:
+            self._tidy()
+
+    def _tidy(self):
+        """Rebuild the heaps once more than half of their entries are stale (amortized O(1) per change)."""
+        live = len(self.current)
+        if len(self.due_heap) + len(self.priority_heap) > 4 * live + 64:
+            self.due_heap = [(due, i) for i, (due, _) in self.current.items() if due is not None]
+            self.priority_heap = [(p, i) for i, (_, p) in self.current.items() if p is not None]
+            heapq.heapify(self.due_heap)
+            heapq.heapify(self.priority_heap)
+
+    def _smallest(self, heap, field, n, stop=None):
+        """
+        Ids of the n smallest live entries of heap (field 0 = due, 1 = priority).
+        - Stale entries met on the way are dropped for good.
+        - stop(value) can end the search early (used for "overdue").
+        The live entries we took out are pushed back, so this costs O(k log n)
+        for k results instead of sorting everything.
+        """
+        found = []
+        seen = set()
+        while heap and len(found) < n:
+            value, task_id = heap[0]
+            if stop is not None and stop(value):
+                break
+            heapq.heappop(heap)
+            current = self.current.get(task_id)
+            if current is None or current[field] != value or task_id in seen:
+                continue
+            seen.add(task_id)
+            found.append((value, task_id))
+        for entry in found:
+            heapq.heappush(heap, entry)
+        return [task_id for _, task_id in found]
+
+    def next_due(self, n):
+        """Ids of the n pending tasks due soonest."""
+        return self._smallest(self.due_heap, 0, n)
+
+    def overdue(self, today):
+        """Ids of pending tasks due before today (a "YYYY-MM-DD" string), earliest first."""
+        return self._smallest(self.due_heap, 0, len(self.current), stop=lambda due: due >= today)
+
+    def top_priority(self, n):
+        """Ids of the n most important pending tasks (priority 1 first)."""
+        return self._smallest(self.priority_heap, 1, n)
@@ -0,0 +1,64 @@
+"""
+Searching the To-Do List App.
+Checking `word in task.title` for every task gets slow with tens of thousands of
+tasks, so SearchIndex keeps an "inverted index": for every word, the ids of the
+tasks whose title contains it. Finding tasks with a word is then one dictionary
+lookup, like the index at the back of a book.
+"""
+
+import re
+
+WORDS = re.compile(r"\w+")
+
+
+def words(text):
+    """The distinct lower-case words in text: "Buy MILK, buy eggs" -> {"buy", "milk", "eggs"}."""
+    return set(WORDS.findall(text.casefold()))
+
+
+class SearchIndex:
+    """
+    word -> set of ids of the tasks whose title has that word.
+    TaskList calls add() and discard() whenever a task is added or removed.
+    Completing a task doesn't change its title, so the index doesn't need to know;
+    the done/pending status filter uses TaskList.pending and TaskList.done instead.
+    """
+
+    def __init__(self):
+        self.ids_by_word = {}
+
+    def add(self, task):
+        for word in words(task.title):
+            self.ids_by_word.setdefault(word, set()).add(task.id)
+
+    def discard(self, task):
+        for word in words(task.title):
+            ids = self.ids_by_word.get(word)
+            if ids is not None:
+                ids.discard(task.id)
+                if not ids:
+                    del self.ids_by_word[word]
+
+    def search(self, query, only=None):
+        """
+        Ids of the tasks whose title has every word in query (in no particular order).
+        - only: a dict of the allowed tasks by id (e.g. TaskList.pending), or None for all.
+        We start from the rarest word and check the others with set lookups, so the
+        work depends on how many tasks have that word, not on how many tasks there are.
+        """
+        wanted = words(query)
+        if not wanted:
+            return []
+        postings = []
+        for word in wanted:
+            ids = self.ids_by_word.get(word)
+            if not ids:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+        rarest, others = postings[0], postings[1:]
+        if only is not None and len(only) < len(rarest):
+            rarest, only = only.keys(), None
+            others = postings
+        return [task_id for task_id in rarest
+                if all(task_id in ids for ids in others) and (only is None or task_id in only)]
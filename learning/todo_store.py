@@ -0,0 +1,232 @@
+"""
+Task storage for the To-Do List App.
+Each task is a small Task record (id, title, done flag and timestamps) instead of a
+plain string, and TaskList keeps running track of which tasks are done and which
+are still pending, so questions like "how many are done?" never need a loop.
+"""
+
+import time
+from datetime import date
+
+from todo_schedule import Schedule
+from todo_search import SearchIndex
+
+
+def check_schedule(priority, due):
+    """
+    Check a priority and due date the same way the menu does, before they are stored:
+    priority must be a whole number 1 or more and due a real "YYYY-MM-DD" date
+    (None means "none"). Returns them as they should be saved; raises ValueError otherwise.
+    """
+    if priority is not None and (type(priority) is not int or priority < 1):
+        raise ValueError(f"priority must be a whole number 1 or more, not {priority!r}")
+    if due is not None:
+        if not isinstance(due, str):
+            raise ValueError(f"due must be a YYYY-MM-DD date, not {due!r}")
+        # fromisoformat() raises ValueError for anything that isn't a real date.
+        due = date.fromisoformat(due).isoformat()
+    return priority, due
+
+
+class Task:
+    """
+    One to-do item.
+    __slots__ stores exactly these fields and nothing else, which keeps each task
+    small in memory (no per-task dictionary like a normal object has).
+    """
+
+    __slots__ = ("id", "title", "done", "created", "completed", "priority", "due")
+
+    def __init__(self, id, title, created=None, done=False, completed=None, priority=None, due=None):
+        self.id = id
+        self.title = title
+        self.created = time.time() if created is None else created
+        self.done = done
+        self.completed = completed
+        # Optional: priority 1 is the most important; due is a "YYYY-MM-DD" string.
+        self.priority = priority
+        self.due = due
+
+    def __str__(self):
+        # This is how a task is shown in the list, e.g. "[DONE] Buy milk (due 2026-01-31, priority 1)".
+        text = f"[DONE] {self.title}" if self.done else self.title
+        details = []
+        if self.due is not None:
+            details.append(f"due {self.due}")
+        if self.priority is not None:
+            details.append(f"priority {self.priority}")
+        if details:
+            text += " (" + ", ".join(details) + ")"
+        return text
+
+
+class TaskList:
+    """
+    All tasks in the order they were added, looked up by their id.
+    - items:   id -> Task for every task. Python dicts remember insertion order,
+               so this is also oldest-first, but unlike a list, removing a task
+               doesn't shift everything after it: removal is O(1).
+               Ids never change, so a task's number stays the same after deletes.
+    - pending: id -> Task for tasks not done yet.
+    - done:    id -> Task for completed tasks.
+    pending and done are updated on every change, so counting or listing the tasks
+    with one status only touches those tasks.
+    - schedule: heaps of pending tasks by due date and priority (see todo_schedule.py),
+      also updated on every change, for "what's next" questions.
+    - index:   word -> task ids (see todo_search.py), for searching titles.
+
+    Every change is described by a small "record" dict, for example
+        {"op": "add", "id": 3, "title": "Buy milk", "created": 1700000000.0}
+        {"op": "complete", "id": 3, "at": 1700000100.0}
+        {"op": "reopen", "id": 3}
+        {"op": "schedule", "id": 3, "priority": 1, "due": "2026-01-31"}
+        {"op": "remove", "id": 3}
+    and made by apply(). If a journal is attached (see todo_journal.py), each
+    record is also written to it so the change survives a restart, and if a
+    history is attached (see todo_history.py) the change can be undone.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.pending = {}
+        self.done = {}
+        self.next_id = 1
+        self.journal = None
+        self.schedule = Schedule()
+        self.index = SearchIndex()
+        self.history = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items.values())
+
+    def get(self, task_id):
+        """The task with this id, or None."""
+        return self.items.get(task_id)
+
+    @property
+    def done_count(self):
+        return len(self.done)
+
+    @property
+    def pending_count(self):
+        return len(self.pending)
+
+    def add(self, title):
+        """Create a new pending task at the end of the list and return it."""
+        return self.apply({"op": "add", "id": self.next_id, "title": title, "created": time.time()})
+
+    def remove(self, task_id):
+        """Remove and return the task with this id (None if there isn't one)."""
+        return self.apply({"op": "remove", "id": task_id})
+
+    def complete(self, task):
+        """Mark a task as done. Returns False if it already was."""
+        if task.done:
+            return False
+        self.apply({"op": "complete", "id": task.id, "at": time.time()})
+        return True
+
+    def set_schedule(self, task_id, priority, due):
+        """Give a task a priority (1 = most important) and/or due date ("YYYY-MM-DD"); None clears it."""
+        return self.apply({"op": "schedule", "id": task_id, "priority": priority, "due": due})
+
+    def _tasks(self, ids):
+        return [self.items[task_id] for task_id in ids]
+
+    def next_due(self, n=5):
+        """The n pending tasks due soonest."""
+        return self._tasks(self.schedule.next_due(n))
+
+    def overdue(self, today=None):
+        """Pending tasks whose due date has passed."""
+        today = today or date.today().isoformat()
+        return self._tasks(self.schedule.overdue(today))
+
+    def top_priority(self, n=5):
+        """The n most important pending tasks."""
+        return self._tasks(self.schedule.top_priority(n))
+
+    def search(self, query, status=None):
+        """
+        Tasks whose title has every word in query, oldest first.
+        status can be "pending" or "done" to only look at tasks with that status.
+        """
+        only = {"pending": self.pending, "done": self.done}.get(status)
+        return self._tasks(sorted(self.index.search(query, only)))
+
+    def apply(self, record, log=True):
+        """
+        Make the change described by record and return the task it affected.
+        - Applying the same record twice does no harm, which keeps replaying
+          the journal after a crash safe.
+        - log=False is used while replaying, so records aren't written twice.
+        - A bad priority or due date raises ValueError before anything is changed.
+        """
+        if record["op"] in ("add", "schedule"):
+            check_schedule(record.get("priority"), record.get("due"))
+        if log and self.history is not None:
+            self.history.record(record)
+        op = record["op"]
+        task_id = record["id"]
+        task = self.items.get(task_id)
+        if op == "add":
+            if task is None:
+                task = Task(task_id, record["title"], record["created"],
+                            priority=record.get("priority"), due=record.get("due"))
+                self.items[task_id] = task
+                self.pending[task_id] = task
+                self.schedule.update(task)
+                self.index.add(task)
+            self.next_id = max(self.next_id, task_id + 1)
+        elif task is None:
+            return None
+        elif op == "remove":
+            del self.items[task_id]
+            if task.done:
+                del self.done[task_id]
+            else:
+                del self.pending[task_id]
+            self.schedule.discard(task_id)
+            self.index.discard(task)
+        elif op == "complete" and not task.done:
+            task.done = True
+            task.completed = record["at"]
+            del self.pending[task_id]
+            self.done[task_id] = task
+            self.schedule.discard(task_id)
+        elif op == "reopen" and task.done:
+            task.done = False
+            task.completed = None
+            del self.done[task_id]
+            self.pending[task_id] = task
+            self.schedule.update(task)
+        elif op == "schedule":
+            task.priority = record["priority"]
+            task.due = record["due"]
+            self.schedule.update(task)
+        if log and self.journal is not None:
+            self.journal.append(record)
+        return task
+
+    def to_dict(self):
+        """Everything needed to rebuild the list, in a form json.dump() can save."""
+        return {
+            "next_id": self.next_id,
+            "tasks": [
+                {"id": t.id, "title": t.title, "created": t.created, "done": t.done, "completed": t.completed,
+                 "priority": t.priority, "due": t.due}
+                for t in self.items.values()
+            ],
+        }
+
+    def load_dict(self, data):
+        """Rebuild the list from what to_dict() returned."""
+        for item in data["tasks"]:
+            self.apply({"op": "add", "id": item["id"], "title": item["title"], "created": item["created"],
+                        "priority": item.get("priority"), "due": item.get("due")}, log=False)
+            if item["done"]:
+                self.apply({"op": "complete", "id": item["id"], "at": item["completed"]}, log=False)
+        self.next_id = max(self.next_id, data["next_id"])
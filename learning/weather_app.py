@@ -1,6 +1,229 @@
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from weather_cache import WeatherCache, normalize_city
+from weather_history import ObservationStore
+from weather_parse import parse_lean
+from weather_prefetch import DEFAULT_INTERVAL, Prefetcher, read_watchlist
+from weather_resilience import CircuitBreaker, CircuitOpenError, Coalescer, is_temporary, retry
+
+# Where to get the weather from. Set WEATHER_URL to use another server, such as
+# the pretend wttr.in in weather_standin.py: WEATHER_URL=http://127.0.0.1:8123
+BASE_URL = os.environ.get("WEATHER_URL", "http://wttr.in")
+
+# Reports are remembered for a while (and saved to this file between runs), so
+# asking for the same city again doesn't need the internet. See weather_cache.py.
+CACHE_FILE = "weather_cache.json"
+cache = WeatherCache(path=CACHE_FILE)
+
+# Every downloaded report is also added to a history of observations per city
+# (see weather_history.py), which `python weather_app.py --history CITY` summarizes.
+HISTORY_DIR = "weather_history"
+history = ObservationStore(HISTORY_DIR)
+
+# How long to wait for wttr.in before giving up on one try (seconds),
+# and how long all tries for one city together may take (see weather_resilience.py).
+TIMEOUT = 10
+DEADLINE = 15
+# Answers are read in pieces of this many bytes.
+CHUNK_SIZE = 8192
+# How many cities fetch_many() downloads at the same time.
+MAX_WORKERS = 32
+
+# One Session is shared by every request. It keeps connections to wttr.in open
+# and reuses them, instead of setting up a new connection for every city.
+# pool_maxsize lets each download thread have its own open connection.
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
+session.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
+
+# What fetch_many() returns for each city:
+# - report:  the Conditions from fetch_weather(), or None if it failed
+# - error:   the exception if it failed, else None
+# - seconds: how long it took (0 for cached reports)
+WeatherResult = namedtuple("WeatherResult", ["city", "report", "error", "seconds"])
+
+# Shared by every thread: requests for a city already being fetched wait for that
+# fetch, and while wttr.in keeps failing we stop calling it for a while.
+coalescer = Coalescer()
+breaker = CircuitBreaker()
+
+# Kiosk mode (python weather_app.py --kiosk): always show the last known report at
+# once and download a fresh one in the background. The cities in WATCHLIST_FILE
+# (one per line) are downloaded again every PREFETCH_INTERVAL seconds.
+WATCHLIST_FILE = "watchlist.txt"
+PREFETCH_INTERVAL = DEFAULT_INTERVAL
+prefetcher = None
+
+
+def download_weather(city, timeout=TIMEOUT):
+    """
+    Download the current weather for city from wttr.in (one try) and return it as Conditions
+    (see weather_parse.py). Raises a requests exception if something goes wrong,
+    so the caller decides what to print.
+    """
+    # Using format=j1 for a clean JSON response
+    url = f"{BASE_URL}/{city}?format=j1"
+
+    # Setting a timeout ensures the app doesn't hang if the site is down.
+    # stream=True lets us read the answer piece by piece instead of all at once.
+    response = session.get(url, timeout=min(timeout, TIMEOUT), stream=True)
+    try:
+        # Raise an exception if the request returned an unsuccessful status code
+        response.raise_for_status()
+
+        # Only the current conditions are decoded; the forecast after them is skipped.
+        report = parse_lean(response.iter_content(CHUNK_SIZE))
+
+        # Read the rest without decoding it, so the connection can be used again.
+        for _ in response.iter_content(CHUNK_SIZE):
+            pass
+    finally:
+        response.close()
+    return report
+
+
+def fetch_weather(city, deadline=DEADLINE):
+    """
+    download_weather(), made safe to call from many threads while wttr.in is struggling:
+    - threads asking for the same city at the same time share one download,
+    - temporary errors are retried with growing random waits, all within `deadline` seconds,
+    - while the circuit breaker is open, CircuitOpenError is raised without waiting at all.
+    """
+    def one_try(timeout):
+        return breaker.call(download_weather, city, timeout)
+    return coalescer.run(normalize_city(city), lambda: retry(one_try, deadline=deadline))
+
+
+def lookup(city, save=True):
+    """
+    The report for city: from the cache if we fetched it recently, otherwise
+    downloaded (and remembered for next time). save=False skips writing the cache file.
+    """
+    report = cache.get(city)
+    if report is None:
+        report = fetch_weather(city)
+        cache.put(city, report)
+        history.add(city, report)
+        if save:
+            cache.save()
+            history.flush()
+    return report
+
+
+def timed_fetch(city, deadline):
+    """fetch_weather() for one city, as a WeatherResult instead of raising."""
+    start = time.perf_counter()
+    try:
+        return WeatherResult(city, fetch_weather(city, deadline), None, time.perf_counter() - start)
+    except Exception as e:
+        return WeatherResult(city, None, e, time.perf_counter() - start)
 
-def get_weather():
+
+def fetch_many(cities, max_workers=MAX_WORKERS, deadline=DEADLINE, refresh=False):
+    """
+    Get the weather for many cities at once and return a WeatherResult for each, in the same order.
+    - Cities in the cache are answered straight away (unless refresh=True, which downloads them all).
+    - The rest are downloaded by a pool of up to max_workers threads at the same
+      time, so the whole batch takes about as long as the slowest single city.
+    - A city listed twice (even spelled differently, like "Paris" and " paris") is downloaded once.
+    """
+    results = {}
+    to_fetch = {}
+    for city in cities:
+        key = normalize_city(city)
+        if key in results or key in to_fetch:
+            continue
+        report = None if refresh else cache.get(city)
+        if report is not None:
+            results[key] = WeatherResult(city, report, None, 0.0)
+        else:
+            to_fetch[key] = city
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(to_fetch))) as pool:
+            # pool.map runs timed_fetch in the threads and gives the results back in order.
+            fetched = pool.map(lambda city: timed_fetch(city, deadline), to_fetch.values())
+            for key, result in zip(to_fetch, fetched):
+                results[key] = result
+                if result.error is None:
+                    cache.put(result.city, result.report)
+                    history.add(result.city, result.report)
+        cache.save()
+        history.flush()
+    return [results[normalize_city(city)]._replace(city=city) for city in cities]
+
+
+def start_prefetcher(watchlist=()):
+    """Start the background worker that keeps reports fresh (see weather_prefetch.py)."""
+    global prefetcher
+    if prefetcher is None:
+        prefetcher = Prefetcher(lambda cities: fetch_many(cities, refresh=True), watchlist, PREFETCH_INTERVAL)
+        prefetcher.start()
+    return prefetcher
+
+
+def lookup_stale(city):
+    """
+    Kiosk mode lookup ("stale-while-revalidate"): return (report, age in seconds) straight away.
+    - If we have any report for city, even an expired one, it is returned without
+      waiting, and an expired one is downloaded again in the background.
+    - Only a city we've never seen has to wait for the network.
+    """
+    found = cache.peek(city)
+    if found is None:
+        return lookup(city), 0.0
+    report, age = found
+    if age > cache.ttl:
+        start_prefetcher().refresh_later(city)
+    return report, age
+
+
+def describe_age(seconds):
+    """3725 -> "1 hour 2 minutes"."""
+    if seconds < 60:
+        return "less than a minute"
+    minutes = int(seconds // 60)
+    hours, minutes = divmod(minutes, 60)
+    parts = []
+    if hours:
+        parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
+    if minutes:
+        parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
+    return " ".join(parts)
+
+
+def print_report(city, report, age=None):
+    """Format the output nicely. age (seconds) marks reports that may be out of date."""
+    print("-" * 30)
+    print(f"Weather Report for: {city.capitalize()}")
+    if age is not None and age > cache.ttl:
+        print(f"(Last known report, from {describe_age(age)} ago)")
+    print("-" * 30)
+    print(f"Condition:    {report['weather_desc']}")
+    print(f"Temperature:  {report['temp_c']}°C ({report['temp_f']}°F)")
+    print(f"Feels Like:   {report['feels_like']}°C")
+    print(f"Humidity:     {report['humidity']}%")
+    print(f"Wind Speed:   {report['wind_speed']} km/h")
+    print("-" * 30)
+
+
+def print_stale(city):
+    """When wttr.in can't be reached, show the last report we have. Returns False if there is none."""
+    found = cache.peek(city)
+    if found is None:
+        return False
+    print("(Could not reach wttr.in right now.)")
+    print_report(city, *found)
+    return True
+
+
+def get_weather(stale_ok=False):
     # 1. Ask the user for the city name
     city = input("Enter the name of a city: ").strip()
 
@@ -9,52 +232,98 @@ def get_weather():
         print("Error: City name cannot be empty.")
         return
 
-    # 2. Define the URL (using format=j1 for a clean JSON response)
-    url = f"http://wttr.in/{city}?format=j1"
-
     try:
-        # 3. Make the HTTP GET request
-        # Setting a timeout ensures the app doesn't hang if the site is down
-        response = requests.get(url, timeout=10)
+        # 2. Use the cached report if we fetched this city recently,
+        # 3. otherwise download it and remember it for next time
+        #    (in kiosk mode: show any report we have and update it in the background)
+        if stale_ok:
+            report, age = lookup_stale(city)
+        else:
+            report, age = lookup(city), None
 
-        # Raise an exception if the request returned an unsuccessful status code
-        response.raise_for_status()
+        # 4. Show it
+        print_report(city, report, age)
 
-        # 4. Parse the JSON response
-        data = response.json()
-
-        # wttr.in returns data in specific nested lists. 
-        # current_condition[0] contains the most recent weather data.
-        current = data['current_condition'][0]
-        
-        # Extracting specific data points
-        temp_c = current['temp_C']
-        temp_f = current['temp_F']
-        weather_desc = current['weatherDesc'][0]['value']
-        humidity = current['humidity']
-        wind_speed = current['windspeedKmph']
-        feels_like = current['FeelsLikeC']
-
-        # 5. Format the output nicely
-        print("-" * 30)
-        print(f"Weather Report for: {city.capitalize()}")
-        print("-" * 30)
-        print(f"Condition:    {weather_desc}")
-        print(f"Temperature:  {temp_c}°C ({temp_f}°F)")
-        print(f"Feels Like:   {feels_like}°C")
-        print(f"Humidity:     {humidity}%")
-        print(f"Wind Speed:   {wind_speed} km/h")
-        print("-" * 30)
-
-    # 6. Basic Error Handling
+    # 5. Basic Error Handling
+    # When the network is the problem, an older report is better than nothing.
     except requests.exceptions.ConnectionError:
-        print("Error: Could not connect to the internet.")
-    except requests.exceptions.HTTPError:
-        print(f"Error: Could not find weather data for '{city}'. Please check the spelling.")
+        if not print_stale(city):
+            print("Error: Could not connect to the internet.")
+    except requests.exceptions.HTTPError as e:
+        # A server error (5xx) is wttr.in's trouble; anything else means it doesn't know the city.
+        if not (is_temporary(e) and print_stale(city)):
+            print(f"Error: Could not find weather data for '{city}'. Please check the spelling.")
     except requests.exceptions.Timeout:
-        print("Error: The server timed out. Please try again later.")
+        if not print_stale(city):
+            print("Error: The server timed out. Please try again later.")
+    except CircuitOpenError as e:
+        if not print_stale(city):
+            print(f"Error: {e}. Please try again later.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+
+def print_many(cities):
+    """Fetch several cities at once (e.g. python weather_app.py London Paris Tokyo) and print them."""
+    start = time.perf_counter()
+    results = fetch_many(cities)
+    for result in results:
+        if result.error is None:
+            print_report(result.city, result.report)
+        elif not print_stale(result.city):
+            print(f"Error: could not get the weather for '{result.city}' ({result.error}).")
+    print(f"({len(results)} cities in {time.perf_counter() - start:.2f}s)")
+
+
+def print_history(city, bucket="hour"):
+    """
+    Min/max/mean temperature, humidity and wind per hour for the last day (or per day for the last 30).
+    The hours and days are those of UTC, as downsample() groups them, so the times are shown in UTC too.
+    """
+    if bucket not in ("hour", "day"):
+        print("Error: summaries can be per 'hour' or per 'day'.")
+        return
+    days = 1 if bucket == "hour" else 30
+    summaries = history.downsample(city, bucket, start=time.time() - days * 86400)
+    if not summaries:
+        print(f"No saved observations for '{city}' yet.")
+        return
+    print(f"Observations for {city.capitalize()}, per {bucket} in UTC (min / max / mean):")
+    for summary in summaries:
+        when = time.strftime("%Y-%m-%d %H:%M" if bucket == "hour" else "%Y-%m-%d", time.gmtime(summary.start))
+        temp, humidity, wind = summary.temp_c, summary.humidity, summary.wind_speed
+        print(f"  {when}  {temp[0]:.0f}/{temp[1]:.0f}/{temp[2]:.1f}°C  "
+              f"humidity {humidity[0]:.0f}/{humidity[1]:.0f}/{humidity[2]:.0f}%  "
+              f"wind {wind[0]:.0f}/{wind[1]:.0f}/{wind[2]:.1f} km/h  ({summary.count} readings)")
+
+
+def kiosk_watchlist(cities):
+    """The cities to keep fresh in kiosk mode: those given on the command line, else WATCHLIST_FILE."""
+    if cities:
+        return cities
+    if os.path.exists(WATCHLIST_FILE):
+        return read_watchlist(WATCHLIST_FILE)
+    return []
+
+
 if __name__ == "__main__":
-    get_weather()
\ No newline at end of file
+    # python weather_app.py --kiosk [CITY ...]: show last known reports at once, refresh in the background.
+    # python weather_app.py --history CITY [day]: summarize the saved observations.
+    if len(sys.argv) > 2 and sys.argv[1] == "--history":
+        print_history(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else "hour")
+        sys.exit()
+    kiosk = len(sys.argv) > 1 and sys.argv[1] == "--kiosk"
+    if kiosk:
+        start_prefetcher(kiosk_watchlist(sys.argv[2:]))
+    elif len(sys.argv) > 1:
+        print_many(sys.argv[1:])
+        sys.exit()
+    while True:
+        get_weather(stale_ok=kiosk)
+        if input("Look up another city? (y/n): ").strip().lower() != "y":
+            break
+    if prefetcher is not None:
+        prefetcher.stop()
+    stats = cache.stats()
+    print(f"(Cache: {stats['hits']} answered from cache, {stats['misses']} downloaded, "
+          f"{stats['stale']} out-of-date reports shown)")
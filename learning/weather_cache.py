@@ -0,0 +1,137 @@
+"""
+A cache for weather_app.py, so looking up the same city again soon doesn't ask wttr.in again.
+- Entries expire after `ttl` seconds, because the weather changes. Expired
+  entries are still kept (up to `max_stale` seconds) so that peek() can offer
+  the last known report when wttr.in can't be reached.
+- At most `max_entries` cities are kept. When a new one doesn't fit, the one
+  used least recently is dropped ("LRU" = least recently used).
+- If a path is given, the cache is saved to that file and loaded from it,
+  so it still works after the program is restarted.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from file_lock import write_atomically
+from weather_parse import conditions_from_json, conditions_to_json
+
+# Weather reports are kept for 10 minutes.
+DEFAULT_TTL = 600
+DEFAULT_MAX_ENTRIES = 256
+# Reports older than a day are too old to show even as "last known".
+DEFAULT_MAX_STALE = 24 * 3600
+
+
+def normalize_city(city):
+    """"  new   YORK " and "New York" should share one cache entry: -> "new york"."""
+    return " ".join(city.split()).casefold()
+
+
+class WeatherCache:
+    """
+    city -> (time stored, report) in an OrderedDict.
+    An OrderedDict remembers the order keys were added and can move a key to the
+    end in O(1), so "most recently used" is always at the end and the entry to
+    drop is always at the front.
+    hits and misses count how often get() could and couldn't answer from the cache;
+    stale counts how often peek() handed out an expired report.
+    A lock lets several threads use the same cache safely.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, path=None, max_stale=DEFAULT_MAX_STALE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        if path is not None:
+            self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, city):
+        """The cached report for city, or None if there isn't a fresh one."""
+        key = normalize_city(city)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                if entry is not None and time.time() - entry[0] > self.max_stale:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, city, report):
+        """Remember report for city, dropping the least recently used city if the cache is full."""
+        key = normalize_city(city)
+        with self.lock:
+            self.entries[key] = (time.time(), report)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def peek(self, city):
+        """
+        (report, age in seconds) of the newest report we have for city, even if it
+        has expired, or None if there is none (or it's older than max_stale).
+        """
+        key = normalize_city(city)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            age = time.time() - entry[0]
+            if age > self.max_stale:
+                return None
+            self.entries.move_to_end(key)
+            if age > self.ttl:
+                self.stale += 1
+            return entry[1], age
+
+    def stats(self):
+        """Counts, e.g. {"hits": 3, "misses": 1, "stale": 0, "entries": 1}."""
+        return {"hits": self.hits, "misses": self.misses, "stale": self.stale, "entries": len(self.entries)}
+
+    def load(self):
+        """Read saved entries from self.path (a missing or damaged file just means an empty cache)."""
+        if not os.path.exists(self.path):
+            return
+        now = time.time()
+        entries = OrderedDict()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f, object_hook=conditions_from_json)
+            # A file that is valid JSON can still hold the wrong things, e.g. {"london": 1};
+            # unpacking or comparing those raises ValueError or TypeError.
+            for key, stored_at, report in saved:
+                if not isinstance(key, str):
+                    raise TypeError(f"bad cache key {key!r}")
+                if now - stored_at <= self.max_stale:
+                    entries[key] = (stored_at, report)
+        except (ValueError, TypeError, IOError):
+            return
+        # Entries were saved oldest-used first, so the most recently used ones are kept.
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        self.entries = entries
+
+    def save(self):
+        """Write the entries to self.path, oldest-used first so the order survives a restart."""
+        if self.path is None:
+            return
+        with self.lock:
+            saved = [[key, stored_at, report] for key, (stored_at, report) in self.entries.items()]
+        # save_lock stops two threads from writing the same temporary file at once.
+        with self.save_lock:
+            write_atomically(self.path, lambda f: json.dump(saved, f, default=conditions_to_json))
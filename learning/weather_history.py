@@ -0,0 +1,199 @@
+"""
+Keeping the weather reports weather_app.py downloads, so we can look back at them.
+
+Each observation is 5 numbers: when, temperature, feels-like, humidity and wind speed.
+Stored as Python objects that would be ~200 bytes; here they take 11 bytes,
+because each number goes into an `array` of a small fixed-size type:
+    time        "I"  whole seconds since 1970      4 bytes
+    temp_c      "h"  tenths of a degree             2 bytes
+    feels_like  "h"  tenths of a degree             2 bytes
+    humidity    "B"  percent (0-100)                1 byte
+    wind_speed  "H"  tenths of a km/h               2 bytes
+A year of readings every 5 minutes is about 1.2 MB per city (1.2 GB for 1000 cities).
+
+On disk every city has a folder with one file per column (weather_history/london/temp_c.h, ...).
+- New readings are appended to the end of each file, so saving is cheap however
+  long the history is, and nothing needs to be kept in memory between queries.
+- Readings are kept in time order, so a time range is found with bisect (binary
+  search) on the time column, straight in the file through mmap (so only the few
+  readings bisect looks at are read), and only that part of the other columns is read.
+  (A reading older than the newest one already saved is skipped, see _append.)
+"""
+
+import mmap
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from urllib.parse import quote, unquote
+
+from weather_cache import normalize_city
+
+# (column name, array type code, stored as value * scale)
+COLUMNS = [
+    ("time", "I", 1),
+    ("temp_c", "h", 10),
+    ("feels_like", "h", 10),
+    ("humidity", "B", 1),
+    ("wind_speed", "H", 10),
+]
+VALUE_COLUMNS = [name for name, _, _ in COLUMNS[1:]]
+
+BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+
+Observation = namedtuple("Observation", [name for name, _, _ in COLUMNS])
+# One hour or day of a downsample: its start time, how many readings it has, and
+# (min, max, mean) for each value column.
+Summary = namedtuple("Summary", ["start", "count"] + VALUE_COLUMNS)
+
+
+def column_path(folder, name, typecode):
+    return os.path.join(folder, f"{name}.{typecode}")
+
+
+class ObservationStore:
+    """
+    Observations for many cities, kept in `folder`.
+    - add() collects new readings in memory (pending), per city.
+    - flush() appends them to the files.
+    - observations() and downsample() read a time range back from the files.
+    A lock makes it safe to add from several threads (e.g. the prefetch worker).
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.pending = {}
+        self.checked = set()
+        self.lock = threading.Lock()
+
+    def city_folder(self, city):
+        # quote() turns "new york" into "new%20york", which is safe as a folder name.
+        return os.path.join(self.folder, quote(normalize_city(city), safe=""))
+
+    def cities(self):
+        """The (normalized) names of all cities with saved observations."""
+        if not os.path.isdir(self.folder):
+            return []
+        return sorted(unquote(name) for name in os.listdir(self.folder))
+
+    def add(self, city, report, when=None):
+        """
+        Remember one report (anything with temp_c, feels_like, humidity and
+        wind_speed, like weather_parse.Conditions) observed at `when` (default: now).
+        """
+        when = int(time.time() if when is None else when)
+        values = [when] + [round(float(report[name]) * scale) for name, _, scale in COLUMNS[1:]]
+        with self.lock:
+            columns = self.pending.get(normalize_city(city))
+            if columns is None:
+                columns = self.pending[normalize_city(city)] = [array(code) for _, code, _ in COLUMNS]
+            for column, value in zip(columns, values):
+                column.append(value)
+
+    def flush(self):
+        """Write every pending observation to disk."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            for key, columns in pending.items():
+                self._append(key, columns)
+
+    def _count(self, folder):
+        """How many complete observations are saved in folder (the shortest column decides)."""
+        counts = []
+        for name, code, _ in COLUMNS:
+            path = column_path(folder, name, code)
+            counts.append(os.path.getsize(path) // array(code).itemsize if os.path.exists(path) else 0)
+        return min(counts)
+
+    def _read_columns(self, folder, first=0, last=None):
+        """Observations first..last-1 of every column, as arrays."""
+        count = self._count(folder)
+        last = count if last is None else min(last, count)
+        columns = []
+        for name, code, _ in COLUMNS:
+            column = array(code)
+            if last > first:
+                with open(column_path(folder, name, code), "rb") as f:
+                    f.seek(first * column.itemsize)
+                    column.fromfile(f, last - first)
+            columns.append(column)
+        return columns
+
+    def _append(self, key, columns):
+        folder = os.path.join(self.folder, quote(key, safe=""))
+        os.makedirs(folder, exist_ok=True)
+        count = self._count(folder)
+        if key not in self.checked:
+            # A crash in the middle of an append can leave some columns one reading
+            # longer than others; cut them back so all columns line up again.
+            for name, code, _ in COLUMNS:
+                path = column_path(folder, name, code)
+                if os.path.exists(path):
+                    os.truncate(path, count * array(code).itemsize)
+            self.checked.add(key)
+        rows = sorted(zip(*columns), key=lambda row: row[0])
+        if count:
+            # Readings must stay in time order for bisect to work. One older than
+            # the newest saved reading (e.g. after the clock was set back) is skipped.
+            newest = self._read_columns(folder, count - 1, count)[0][0]
+            rows = [row for row in rows if row[0] >= newest]
+        for index, (name, code, _) in enumerate(COLUMNS):
+            with open(column_path(folder, name, code), "ab") as f:
+                array(code, (row[index] for row in rows)).tofile(f)
+
+    def _range(self, city, start, end):
+        """Columns (as stored) of the observations with start <= time < end."""
+        self.flush()
+        folder = self.city_folder(city)
+        if not os.path.isdir(folder):
+            return None
+        count = self._count(folder)
+        first, last = 0, count
+        if count and (start is not None or end is not None):
+            with open(column_path(folder, "time", "I"), "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # cast("I") lets bisect read the file's bytes as a list of times.
+                times = memoryview(data).cast("I")
+                try:
+                    if start is not None:
+                        first = bisect_left(times, start, 0, count)
+                    if end is not None:
+                        last = bisect_left(times, end, first, count)
+                finally:
+                    times.release()
+        return self._read_columns(folder, first, last)
+
+    def observations(self, city, start=None, end=None):
+        """The Observations for city with start <= time < end (None = no limit), oldest first."""
+        columns = self._range(city, start, end)
+        if columns is None:
+            return []
+        scales = [scale for _, _, scale in COLUMNS]
+        return [Observation(*(value / scale if scale != 1 else value for value, scale in zip(row, scales)))
+                for row in zip(*columns)]
+
+    def downsample(self, city, bucket="hour", start=None, end=None):
+        """
+        One Summary per hour or day ("hour" / "day", in UTC) that has readings, oldest first.
+        Each bucket is found with bisect, and min/max/sum run over array slices,
+        so the Python loop runs once per bucket, not once per reading.
+        """
+        size = BUCKET_SECONDS[bucket]
+        columns = self._range(city, start, end)
+        if columns is None:
+            return []
+        times = columns[0]
+        summaries = []
+        first = 0
+        while first < len(times):
+            bucket_start = times[first] // size * size
+            last = bisect_left(times, bucket_start + size, first)
+            stats = []
+            for column, (_, _, scale) in zip(columns[1:], COLUMNS[1:]):
+                part = column[first:last]
+                stats.append((min(part) / scale, max(part) / scale, sum(part) / len(part) / scale))
+            summaries.append(Summary(bucket_start, last - first, *stats))
+            first = last
+        return summaries
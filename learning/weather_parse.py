@@ -0,0 +1,84 @@
+# Reading wttr.in's answer without building the whole thing
+# A format=j1 answer is 30-50 KB of JSON: the current weather, where it is, and a
+# three-day forecast with eight steps per day. weather_app.py only shows six
+# values, all inside "current_condition", which wttr.in sends first.
+# parse_lean() reads the answer piece by piece as it arrives, and as soon as the
+# "current_condition" list is complete it decodes just that part and stops, so the
+# forecast is never turned into Python objects at all.
+
+import json
+
+from slotted_record import SlottedRecord, record_to_json
+
+FIELDS = ("temp_c", "temp_f", "weather_desc", "humidity", "wind_speed", "feels_like")
+
+CURRENT_KEY = b'"current_condition"'
+decoder = json.JSONDecoder()
+
+
+class Conditions(SlottedRecord):
+    """
+    The six values weather_app.py shows, stored in __slots__ instead of a dict
+    (see slotted_record.py). It still reads like a dict:
+    report["temp_c"], dict(report), report == {...}.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, temp_c, temp_f, weather_desc, humidity, wind_speed, feels_like):
+        self.temp_c = temp_c
+        self.temp_f = temp_f
+        self.weather_desc = weather_desc
+        self.humidity = humidity
+        self.wind_speed = wind_speed
+        self.feels_like = feels_like
+
+    @classmethod
+    def from_current(cls, current):
+        """Pick our values out of one entry of wttr.in's "current_condition" list."""
+        return cls(current['temp_C'], current['temp_F'], current['weatherDesc'][0]['value'],
+                   current['humidity'], current['windspeedKmph'], current['FeelsLikeC'])
+
+
+# json.dump(default=...) and json.load(object_hook=...) hooks for the weather cache file.
+conditions_to_json = record_to_json
+conditions_from_json = Conditions.from_json
+
+
+def parse_full(body):
+    """The old way: decode the whole answer (bytes), then pick out current_condition."""
+    return Conditions.from_current(json.loads(body)['current_condition'][0])
+
+
+def parse_lean(chunks):
+    """
+    Read Conditions from an answer arriving as chunks of bytes (e.g. response.iter_content()).
+    - Chunks are added to a buffer until it holds the "current_condition" key and
+      the whole list after it; then only that list is decoded, with raw_decode(),
+      which stops at the end of the list and ignores everything after it.
+    - Chunks after that point are never read; the caller can throw them away.
+    - If the answer doesn't look as expected, it falls back to parse_full().
+    """
+    buffer = bytearray()
+    key_end = -1
+    list_start = -1
+    for chunk in chunks:
+        buffer += chunk
+        if key_end < 0:
+            # Only search the new bytes (plus a few before, in case the key was split between chunks).
+            found = buffer.find(CURRENT_KEY, max(0, len(buffer) - len(chunk) - len(CURRENT_KEY)))
+            if found < 0:
+                continue
+            key_end = found + len(CURRENT_KEY)
+        if list_start < 0:
+            list_start = buffer.find(b"[", key_end)
+            if list_start < 0:
+                continue
+        # "ignore" drops a character cut in half at the end of the buffer; the list itself is whole by then.
+        text = buffer[list_start:].decode("utf-8", "ignore")
+        try:
+            current, _ = decoder.raw_decode(text)
+        except json.JSONDecodeError:
+            continue  # The list isn't complete yet: read more.
+        return Conditions.from_current(current[0])
+    return parse_full(bytes(buffer))
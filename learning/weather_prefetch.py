@@ -0,0 +1,100 @@
+"""
+Keeping weather reports up to date in the background, for screens that should
+never sit waiting on the network (see "kiosk mode" in weather_app.py).
+A Prefetcher runs one worker thread that:
+- every `interval` seconds downloads all the cities on its watchlist again, and
+- in between, downloads any city someone asked for with refresh_later(),
+  e.g. because the report we just showed them had expired.
+"""
+
+import queue
+import threading
+import time
+
+# Watched cities are downloaded again this often (seconds).
+DEFAULT_INTERVAL = 300
+
+
+def read_watchlist(path):
+    """The cities in a text file, one per line (blank lines and lines starting with # are skipped)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+class Prefetcher:
+    """
+    refresh(cities) is the function that downloads a list of cities and stores the
+    results (weather_app passes fetch_many). Errors are its business: if a download
+    fails, the old report simply stays in the cache.
+    queued holds the cities waiting in the queue, so asking twice only fetches once.
+    """
+
+    def __init__(self, refresh, watchlist=(), interval=DEFAULT_INTERVAL):
+        self.refresh = refresh
+        self.watchlist = list(watchlist)
+        self.interval = interval
+        self.queue = queue.Queue()
+        self.queued = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        """Start the worker thread. It is a daemon thread, so it won't keep the program running."""
+        self.thread = threading.Thread(target=self._run, name="weather-prefetch", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Ask the worker to finish and wait for it."""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def refresh_later(self, city):
+        """Download city in the background soon (does nothing if it is already waiting)."""
+        with self.lock:
+            if city in self.queued:
+                return
+            self.queued.add(city)
+        self.queue.put(city)
+
+    def _take_queued(self, first):
+        """first plus everything else waiting in the queue, so they're fetched together."""
+        cities = [first]
+        while True:
+            try:
+                city = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if city is None:
+                # Put the stop signal back for the main loop to see.
+                self.queue.put(None)
+                break
+            cities.append(city)
+        with self.lock:
+            self.queued.difference_update(cities)
+        return cities
+
+    def _refresh(self, cities):
+        try:
+            self.refresh(cities)
+        except Exception:
+            # Never let one bad round stop the worker; the old reports stay in the cache.
+            pass
+
+    def _run(self):
+        next_round = time.monotonic()
+        while True:
+            wait = next_round - time.monotonic()
+            if wait <= 0:
+                if self.watchlist:
+                    self._refresh(self.watchlist)
+                next_round = time.monotonic() + self.interval
+                continue
+            try:
+                city = self.queue.get(timeout=wait)
+            except queue.Empty:
+                continue
+            if city is None:
+                return
+            self._refresh(self._take_queued(city))
@@ -0,0 +1,130 @@
+"""
+Helpers that keep weather_app.py quick and polite when wttr.in is slow or failing.
+- Coalescer:      if several threads ask for the same city at the same time,
+                  only one request is sent and they all share its answer.
+- retry():        tries again after a short, random, growing wait when an error
+                  looks temporary (a timeout, a dropped connection, a 5xx error).
+- CircuitBreaker: after several failures in a row, stop calling wttr.in for a
+                  while and fail straight away instead of making everyone wait
+                  for a timeout. Then let one request through to see if it's back.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling wttr.in while the circuit breaker is open."""
+
+
+class Coalescer:
+    """
+    Shares one in-flight call per key between all the threads that want it.
+    inflight maps key -> Future: a box that the first thread fills with the
+    answer (or the error) and the other threads wait on.
+    """
+
+    def __init__(self):
+        self.inflight = {}
+        self.lock = threading.Lock()
+
+    def run(self, key, func):
+        """Return func(), unless another thread is already running it for key, then wait for its answer."""
+        with self.lock:
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.inflight[key] = Future()
+        if leader:
+            try:
+                future.set_result(func())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    del self.inflight[key]
+        return future.result()
+
+
+def is_temporary(error):
+    """Errors worth trying again: network trouble, timeouts, "too many requests" and server errors."""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return False
+
+
+def retry(func, attempts=3, base_delay=0.5, max_delay=4.0, deadline=15.0):
+    """
+    Call func(timeout) until it works, at most `attempts` times, and return its result.
+    - Only temporary errors (see is_temporary) are retried; others are raised at once.
+    - Between tries we wait a random time between 0 and base_delay * 2**try
+      (capped at max_delay). The randomness ("jitter") stops many clients that
+      failed together from all retrying at the same moment.
+    - Everything, waits included, must finish within `deadline` seconds; each try's
+      timeout is cut down to the time that is left.
+    """
+    give_up_at = time.monotonic() + deadline
+    for attempt in range(attempts):
+        try:
+            return func(give_up_at - time.monotonic())
+        except Exception as e:
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            if attempt == attempts - 1 or not is_temporary(e) or time.monotonic() + delay >= give_up_at:
+                raise
+        time.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    Counts failures in a row and "opens" (refuses calls) once there are failure_threshold of them.
+    - closed:    normal, calls go through.
+    - open:      calls fail at once with CircuitOpenError, for reset_after seconds.
+    - half-open: after that, one trial call is let through; if it works the
+                 breaker closes again, if not it opens for another reset_after seconds.
+    Only temporary errors count as failures: "no such city" means wttr.in is working fine.
+    """
+
+    def __init__(self, failure_threshold=5, reset_after=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    def _before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited < self.reset_after or self.trial_running:
+                raise CircuitOpenError(f"wttr.in is failing; not trying again for {max(self.reset_after - waited, 0):.0f}s")
+            self.trial_running = True
+
+    def _after_call(self, failed):
+        with self.lock:
+            self.trial_running = False
+            if not failed:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+    def call(self, func, *args):
+        """Return func(*args), or raise CircuitOpenError without calling it if the breaker is open."""
+        self._before_call()
+        try:
+            result = func(*args)
+        except Exception as e:
+            self._after_call(failed=is_temporary(e))
+            raise
+        self._after_call(failed=False)
+        return result
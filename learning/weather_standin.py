@@ -0,0 +1,140 @@
+"""
+A pretend wttr.in that runs on your own computer, for testing and timing weather_app.py
+without the internet (and without bothering the real site).
+
+    python weather_standin.py --port 8123 --latency 0.2 --error-rate 0.05
+    WEATHER_URL=http://127.0.0.1:8123 python weather_app.py London
+
+Every GET /<city>?format=j1 is answered with the same recorded format=j1 payload:
+either a file you saved earlier, e.g.
+    curl "https://wttr.in/London?format=j1" > london.json
+    python weather_standin.py --payload london.json
+or, by default, a built-in sample shaped like the real thing (current conditions,
+the nearest area, and a forecast with eight three-hour steps per day).
+- --latency / --jitter: how long to wait before answering (seconds).
+- --error-rate:         the share of requests answered with "503 Service Unavailable".
+- --days:               forecast days in the built-in sample (more days = bigger payload).
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def sample_hour(time_of_day, temp):
+    """One three-hour step of the forecast, with the same fields wttr.in sends."""
+    return {
+        "DewPointC": "4", "DewPointF": "39", "FeelsLikeC": str(temp - 2), "FeelsLikeF": str((temp - 2) * 9 // 5 + 32),
+        "HeatIndexC": str(temp), "HeatIndexF": str(temp * 9 // 5 + 32), "WindChillC": str(temp - 2),
+        "WindChillF": str((temp - 2) * 9 // 5 + 32), "WindGustKmph": "21", "WindGustMiles": "13",
+        "chanceoffog": "0", "chanceoffrost": "0", "chanceofhightemp": "0", "chanceofovercast": "45",
+        "chanceofrain": "12", "chanceofremdry": "85", "chanceofsnow": "0", "chanceofsunshine": "60",
+        "chanceofthunder": "0", "chanceofwindy": "0", "cloudcover": "38", "diffRad": "41.2",
+        "humidity": "71", "precipInches": "0.0", "precipMM": "0.0", "pressure": "1016",
+        "pressureInches": "30", "shortRad": "112.5", "tempC": str(temp), "tempF": str(temp * 9 // 5 + 32),
+        "time": str(time_of_day), "uvIndex": "2", "visibility": "10", "visibilityMiles": "6",
+        "weatherCode": "116", "weatherDesc": [{"value": "Partly cloudy"}],
+        "weatherIconUrl": [{"value": ""}], "winddir16Point": "WSW", "winddirDegree": "245",
+        "windspeedKmph": "14", "windspeedMiles": "9",
+    }
+
+
+def sample_payload(days=3):
+    """A made-up format=j1 answer with `days` days of forecast."""
+    return {
+        "current_condition": [{
+            "FeelsLikeC": "9", "FeelsLikeF": "48", "cloudcover": "50", "humidity": "76",
+            "localObsDateTime": "2026-01-15 09:00 AM", "observation_time": "09:00 AM",
+            "precipInches": "0.0", "precipMM": "0.0", "pressure": "1015", "pressureInches": "30",
+            "temp_C": "11", "temp_F": "52", "uvIndex": "2", "visibility": "10", "visibilityMiles": "6",
+            "weatherCode": "116", "weatherDesc": [{"value": "Partly cloudy"}], "weatherIconUrl": [{"value": ""}],
+            "winddir16Point": "SW", "winddirDegree": "230", "windspeedKmph": "15", "windspeedMiles": "9",
+        }],
+        "nearest_area": [{
+            "areaName": [{"value": "London"}], "country": [{"value": "United Kingdom"}],
+            "latitude": "51.517", "longitude": "-0.106", "population": "7421228",
+            "region": [{"value": "City of London, Greater London"}], "weatherUrl": [{"value": ""}],
+        }],
+        "request": [{"query": "London, United Kingdom", "type": "City"}],
+        "weather": [{
+            "astronomy": [{"moon_illumination": "40", "moon_phase": "Waxing Crescent", "moonrise": "10:12 AM",
+                           "moonset": "11:48 PM", "sunrise": "07:58 AM", "sunset": "04:21 PM"}],
+            "avgtempC": "9", "avgtempF": "48", "date": f"2026-01-{15 + day:02d}",
+            "hourly": [sample_hour(hour * 300, 6 + hour) for hour in range(8)],
+            "maxtempC": "13", "maxtempF": "55", "mintempC": "6", "mintempF": "43",
+            "sunHour": "5.3", "totalSnow_cm": "0.0", "uvIndex": "2",
+        } for day in range(days)],
+    }
+
+
+def make_handler(body, latency, jitter, error_rate):
+    """A request handler class that answers every GET with body (bytes) after a delay."""
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        # HTTP/1.1 keeps connections open between requests, like the real site,
+        # so a pooled requests.Session can reuse them.
+        protocol_version = "HTTP/1.1"
+        # The headers and the body go out in separate writes. Without this, the
+        # operating system holds the body back until the client acknowledges the
+        # headers, which can add ~40 ms to every answer ("Nagle's algorithm").
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+            if random.random() < error_rate:
+                status, payload, kind = 503, b"Service Unavailable", "text/plain"
+            else:
+                status, payload, kind = 200, body, "application/json"
+            self.send_response(status)
+            self.send_header("Content-Type", kind)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            # Don't print a line for every request.
+            pass
+
+    return StandInHandler
+
+
+def start_server(port=0, latency=0.0, jitter=0.0, error_rate=0.0, days=3, payload=None):
+    """
+    Start the stand-in in a background thread and return (server, base_url).
+    port=0 picks any free port. Call server.shutdown() to stop it.
+    """
+    if payload is not None:
+        with open(payload, "rb") as f:
+            body = f.read()
+    else:
+        body = json.dumps(sample_payload(days)).encode("utf-8")
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(body, latency, jitter, error_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a recorded wttr.in format=j1 payload locally.")
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before each answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency varies by up to this much either way")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503 (0-1)")
+    parser.add_argument("--days", type=int, default=3, help="forecast days in the built-in sample payload")
+    parser.add_argument("--payload", help="serve this saved format=j1 file instead of the built-in sample")
+    args = parser.parse_args()
+    server, url = start_server(args.port, args.latency, args.jitter, args.error_rate, args.days, args.payload)
+    print(f"Pretend wttr.in running at {url} (Ctrl+C to stop)")
+    print(f"Use it with: WEATHER_URL={url} python weather_app.py")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()